@@ -0,0 +1,109 @@
+"""
+Distance analytics over the degrees graph.
+
+single_source gives the distance and predecessor movie of every person
+reachable from one person. distance_matrix and distance_distribution run
+many single-source searches across a process pool. Workers open the same
+binary snapshot (see snapshot.py) with mmap, so the read-only graph is
+shared through the page cache instead of being copied into each process.
+
+Usage: python analytics.py [directory] [--sources N] [--processes P]
+"""
+
+import argparse
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from snapshot import load_snapshot, open_snapshot
+
+# Graph opened by each worker process
+worker_graph = None
+
+
+def single_source(graph, person_id, max_depth=None):
+    """
+    Returns a dictionary mapping every person_id reachable from person_id
+    to a (distance, movie_id) pair, where movie_id is the movie that
+    connects them to the previous person on a shortest path (None for
+    person_id itself).
+    """
+    depth, parent, via = graph.single_source(graph.person_index[person_id],
+                                             max_depth)
+    reached = {}
+    for p in range(len(depth)):
+        if depth[p] >= 0:
+            movie_id = graph.movie_ids[via[p]] if via[p] >= 0 else None
+            reached[graph.person_ids[p]] = (depth[p], movie_id)
+    return reached
+
+
+def init_worker(directory):
+    global worker_graph
+    worker_graph = open_snapshot(directory)
+
+
+def worker_distances(person_id, targets, max_depth):
+    depth, _, _ = worker_graph.single_source(
+        worker_graph.person_index[person_id], max_depth)
+    if targets is None:
+        return Counter(d for d in depth if d >= 0)
+    return [depth[worker_graph.person_index[target]] for target in targets]
+
+
+def run_sources(directory, sources, targets, max_depth, processes):
+    # Make sure a fresh snapshot exists before the workers open it
+    load_snapshot(directory)
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                             initargs=(directory,)) as pool:
+        futures = [pool.submit(worker_distances, source, targets, max_depth)
+                   for source in sources]
+        return [future.result() for future in futures]
+
+
+def distance_matrix(directory, sources, targets, max_depth=None,
+                    processes=None):
+    """
+    Returns a dictionary mapping each source person_id to the list of its
+    distances to each of targets (-1 where not connected).
+    """
+    rows = run_sources(directory, sources, list(targets), max_depth,
+                       processes)
+    return dict(zip(sources, rows))
+
+
+def distance_distribution(directory, sources, max_depth=None,
+                          processes=None):
+    """
+    Returns a Counter of distance -> number of (source, person) pairs over
+    every person reachable from each of sources.
+    """
+    total = Counter()
+    for counts in run_sources(directory, sources, None, max_depth,
+                              processes):
+        total.update(counts)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees of separation "
+                                     "distance analytics.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int)
+    args = parser.parse_args()
+
+    graph = load_snapshot(args.directory)
+    rng = random.Random(args.seed)
+    sources = rng.sample(list(graph.person_ids),
+                         min(args.sources, len(graph.person_ids)))
+
+    distribution = distance_distribution(args.directory, sources,
+                                         processes=args.processes)
+    for distance in sorted(distribution):
+        print(f"{distance} degrees: {distribution[distance]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Benchmarks the degrees-of-separation searches.
+
+Usage: python benchmark.py [directory] [--synthetic PEOPLE] [options]
+
+Without --synthetic, runs against a dataset directory (default "small").
+With --synthetic, first writes a random dataset of that many people to a
+temporary directory in the same CSV format and benchmarks against it.
+
+Every combination of backend, strategy and frontier class runs the same
+seeded source/target pairs, and reports per-query latency percentiles,
+nodes expanded, peak frontier size and memory use. Path lengths must
+agree across all of them.
+
+Each backend also times building the name index and looking up misspelled
+names with suggest_names, against a target of FUZZY_TARGET_MS at p50.
+"""
+
+import argparse
+import csv
+import gc
+import os
+import random
+import tempfile
+import time
+
+import degrees
+from graph import peak_rss
+from util import DequeQueueFrontier, QueueFrontier, SearchStats
+
+STRATEGIES = {
+    "bfs": degrees.shortest_path,
+    "bidirectional": degrees.shortest_path_bidirectional,
+}
+
+# Frontier classes compared for the dict backend's BFS
+FRONTIERS = {
+    "list": QueueFrontier,
+    "deque": DequeQueueFrontier,
+}
+
+BACKENDS = ("dict", "compact", "costars", "snapshot")
+
+# Median suggest_names latency to stay under, in milliseconds
+FUZZY_TARGET_MS = 1.0
+
+# Syllables of synthetic names, which vary like real names rather than
+# all being "Person" and a number, which no name index is built for
+ONSETS = ("b", "c", "d", "f", "g", "h", "j", "k", "l", "m", "n", "p", "r",
+          "s", "t", "v", "w", "z", "br", "ch", "cl", "dr", "fr", "gr", "kr",
+          "pl", "sh", "st", "th", "tr")
+VOWELS = ("a", "e", "i", "o", "u", "ai", "ea", "ee", "ie", "oo", "ou", "y")
+CODAS = ("", "", "n", "r", "l", "s", "t", "m", "ck", "nd", "rt", "ss", "th")
+
+
+def synthetic_word(rng, syllables):
+    return "".join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+                   for _ in range(syllables)).capitalize()
+
+
+def write_synthetic(directory, num_people, movies_per_person=3, cast_size=4,
+                    seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv for a random graph
+    with num_people people into directory.
+
+    First names come from a pool of a few thousand, as real ones repeat,
+    and last names are made up for each person.
+    """
+    rng = random.Random(seed)
+    num_movies = max(1, num_people * movies_per_person // cast_size)
+    first_names = [synthetic_word(rng, rng.choice((1, 2, 2)))
+                   for _ in range(3000)]
+
+    with open(os.path.join(directory, "people.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for i in range(num_people):
+            name = (f"{rng.choice(first_names)} "
+                    f"{synthetic_word(rng, rng.choice((1, 2, 2, 3)))}")
+            writer.writerow([i, name, 1900 + i % 100])
+
+    with open(os.path.join(directory, "movies.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for i in range(num_movies):
+            writer.writerow([i, f"Movie {i}", 1900 + i % 120])
+
+    with open(os.path.join(directory, "stars.csv"), "w", newline="",
+              encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(num_movies):
+            for person in rng.sample(range(num_people),
+                                     min(cast_size, num_people)):
+                writer.writerow([person, movie])
+
+
+def sample_pairs(person_ids, count, seed=0):
+    """
+    Returns a fixed, seeded list of (source, target) pairs.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(person_ids)
+    return [(rng.choice(person_ids), rng.choice(person_ids))
+            for _ in range(count)]
+
+
+def misspell(name, rng):
+    """
+    Returns name with one random character deleted, inserted, replaced or
+    swapped with the next.
+    """
+    i = rng.randrange(len(name))
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    edit = rng.choice(("delete", "insert", "replace", "swap"))
+    if edit == "delete" and len(name) > 1:
+        return name[:i] + name[i + 1:]
+    if edit == "insert":
+        return name[:i] + letter + name[i:]
+    if edit == "swap" and i + 1 < len(name):
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name[:i] + letter + name[i + 1:]
+
+
+def sample_misspellings(names, count, seed=0):
+    """
+    Returns a fixed, seeded list of misspelled names.
+    """
+    rng = random.Random(seed)
+    names = sorted(name for name in names if name)
+    return [misspell(rng.choice(names), rng) for _ in range(count)]
+
+
+def current_rss():
+    """
+    Returns the current resident set size in bytes, or the peak where the
+    current size isn't available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return peak_rss()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(search, pairs):
+    """
+    Runs search over every pair, returning per-query results as
+    (seconds, path length, nodes expanded, peak frontier size).
+    """
+    results = []
+    for source, target in pairs:
+        stats = SearchStats()
+        start = time.perf_counter()
+        path = search(source, target, stats=stats)
+        seconds = time.perf_counter() - start
+        results.append((seconds, None if path is None else len(path),
+                        stats.expanded, stats.frontier_peak))
+    return results
+
+
+def run_names(queries):
+    """
+    Looks up every query with suggest_names, returning the per-query
+    latencies in milliseconds.
+    """
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        degrees.suggest_names(query)
+        latencies.append(1000 * (time.perf_counter() - start))
+    return latencies
+
+
+def load(backend, directory):
+    """
+    Loads directory into the given backend, returning (seconds, bytes of
+    RSS growth) for the load.
+
+    The previous backend's data is dropped first, though the peak RSS of
+    the process still includes it.
+    """
+    degrees.unload_data()
+    gc.collect()
+    before = current_rss()
+    start = time.perf_counter()
+    if backend == "dict":
+        degrees.load_data(directory)
+    elif backend == "compact":
+        degrees.load_data(directory, compact=True)
+    elif backend == "costars":
+        degrees.load_data(directory, compact=True, costars="index")
+    elif backend == "snapshot":
+        degrees.load_data(directory, snapshot=True)
+    return time.perf_counter() - start, current_rss() - before
+
+
+def report(label, results):
+    latencies = [1000 * seconds for seconds, _, _, _ in results]
+    expanded = [row[2] for row in results]
+    peaks = [row[3] for row in results]
+    print(f"{label:32} "
+          f"p50 {percentile(latencies, 0.5):8.3f} ms  "
+          f"p90 {percentile(latencies, 0.9):8.3f} ms  "
+          f"p99 {percentile(latencies, 0.99):8.3f} ms  "
+          f"max {max(latencies):8.3f} ms  "
+          f"expanded {sum(expanded) / len(expanded):9.1f}  "
+          f"frontier peak {max(peaks)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the degrees "
+                                     "of separation searches.")
+    parser.add_argument("directory", nargs="?", default="small")
+    parser.add_argument("--synthetic", type=int, metavar="PEOPLE",
+                        help="benchmark a random graph of PEOPLE people")
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--names", type=int, default=200,
+                        help="misspelled names to look up (0 to skip)")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help="comma separated, from: " + ", ".join(BACKENDS))
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help="comma separated, from: " + ", ".join(STRATEGIES))
+    parser.add_argument("--frontiers",
+                        help="comma separated, from: " + ", ".join(FRONTIERS)
+                        + " (default: all, or deque with --synthetic, as "
+                        "the list frontier is quadratic)")
+    args = parser.parse_args()
+    if args.frontiers is None:
+        args.frontiers = "deque" if args.synthetic else ",".join(FRONTIERS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.directory
+        if args.synthetic:
+            write_synthetic(tmp, args.synthetic, seed=args.seed)
+            directory = tmp
+
+        lengths = None
+        for backend in args.backends.split(","):
+            seconds, growth = load(backend, directory)
+            print(f"{backend}: loaded in {seconds:.3f}s, "
+                  f"RSS +{growth / 2 ** 20:.1f} MiB, "
+                  f"peak RSS {peak_rss() / 2 ** 20:.1f} MiB")
+
+            if degrees.graph is not None:
+                person_ids = degrees.graph.person_ids
+                person_names = degrees.graph.person_names
+            else:
+                person_ids = degrees.people.keys()
+                person_names = [person["name"]
+                                for person in degrees.people.values()]
+            pairs = sample_pairs(person_ids, args.pairs, args.seed)
+
+            if args.names:
+                start = time.perf_counter()
+                degrees.build_name_index()
+                print(f"  name index built in "
+                      f"{time.perf_counter() - start:.3f}s")
+                latencies = run_names(sample_misspellings(
+                    person_names, args.names, args.seed))
+                median = percentile(latencies, 0.5)
+                print(f"  {'suggest_names':30} "
+                      f"p50 {median:8.3f} ms  "
+                      f"p90 {percentile(latencies, 0.9):8.3f} ms  "
+                      f"p99 {percentile(latencies, 0.99):8.3f} ms  "
+                      f"max {max(latencies):8.3f} ms")
+                if median >= FUZZY_TARGET_MS:
+                    print(f"  suggest_names p50 is over the "
+                          f"{FUZZY_TARGET_MS} ms target")
+
+            for strategy in args.strategies.split(","):
+                search = STRATEGIES[strategy]
+                variants = {strategy: search}
+
+                # The frontier class only matters for the dict backend's BFS
+                if backend == "dict" and strategy == "bfs":
+                    variants = {
+                        f"{strategy} ({name})":
+                            lambda s, t, stats, frontier=frontier:
+                                search(s, t, frontier_class=frontier,
+                                       stats=stats)
+                        for name, frontier in (
+                            (name, FRONTIERS[name])
+                            for name in args.frontiers.split(","))
+                    }
+
+                for label, variant in variants.items():
+                    results = run(variant, pairs)
+                    report(f"  {label}", results)
+                    found = [row[1] for row in results]
+                    if lengths is None:
+                        lengths = found
+                    elif found != lengths:
+                        raise SystemExit("Path lengths differ between "
+                                         f"searches ({backend}, {label}).")
+
+
+if __name__ == "__main__":
+    main()
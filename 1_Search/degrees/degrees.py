@@ -1,7 +1,12 @@
+import argparse
 import csv
 import sys
+import threading
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import load_graph
+from nameindex import NameIndex
+from snapshot import load_snapshot
+from util import Node, StackFrontier, QueueFrontier, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +17,56 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed graph, used instead of the dictionaries above
+# when data is loaded with compact=True or snapshot=True
+graph = None
 
-def load_data(directory):
+# Prefix and fuzzy name index, built (or taken from the snapshot) by
+# load_data(index_names=True) or on first use, under name_index_lock since
+# the service answers requests from several threads
+name_index = None
+name_index_lock = threading.Lock()
+
+
+def unload_data():
+    """
+    Drops any data loaded before, so it can be freed.
+    """
+    global graph, name_index
+    names.clear()
+    people.clear()
+    movies.clear()
+    graph = None
+    with name_index_lock:
+        name_index = None
+
+
+def load_data(directory, compact=False, snapshot=False, costars=None,
+              index_names=False):
     """
     Load data from CSV files into memory.
+
+    With snapshot=True, maps the compact graph from a binary snapshot
+    instead, building the snapshot first if it is missing or stale.
+
+    For the compact graph, costars="index" precomputes every person's
+    distinct co-stars, and an integer caches that many people's co-stars.
+
+    With index_names=True, also builds the index suggest_names uses, so
+    that no query has to wait for it.
     """
+    global graph
+    unload_data()
+    if snapshot or compact:
+        graph = load_snapshot(directory) if snapshot else load_graph(directory)
+        if costars == "index":
+            graph.build_costar_index()
+        elif costars:
+            graph.cache_costars(costars)
+        if index_names:
+            build_name_index()
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,15 +101,31 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    if index_names:
+        build_name_index()
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Degrees of separation.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="use the compact integer-indexed graph")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="use (and build if needed) a binary snapshot")
+    parser.add_argument("--costars", metavar="index|SIZE",
+                        help="precompute co-stars of the compact graph, "
+                             "or cache those of SIZE people")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people at once")
+    args = parser.parse_args()
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    costars = args.costars
+    if costars and costars != "index":
+        costars = int(costars)
+    load_data(args.directory, compact=args.compact, snapshot=args.snapshot,
+              costars=costars)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +135,10 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.bidirectional:
+        path = shortest_path_bidirectional(source, target)
+    else:
+        path = shortest_path(source, target)
 
     if path is None:
         print("Not connected.")
@@ -78,21 +147,30 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_info(path[i][1])["name"]
+            person2 = person_info(path[i + 1][1])["name"]
+            movie = movie_info(path[i + 1][0])["title"]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, frontier_class=DequeQueueFrontier,
+                  stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    frontier_class may be QueueFrontier or DequeQueueFrontier from util;
+    both give the same result, the deque one in O(1) per operation.
+    If stats (a util.SearchStats) is given, it counts the nodes expanded
+    and the peak frontier size.
+
     If no possible path, returns None.
     """
+    if graph is not None:
+        return graph.shortest_path(source, target, stats=stats)
+
     root = Node(state=source, parent=None, action=None, depth=0)
-    frontier = QueueFrontier()
+    frontier = frontier_class()
     frontier.add(root)
 
     explored = set()
@@ -124,6 +202,83 @@ def shortest_path(source, target):
         for n in neighbors:
             if n[1] not in explored and not frontier.contains_state(n[1]) and node.depth < 7:
                 frontier.add(Node(state=n[1], parent=node, action=n[0], depth=node.depth+1))
+        if stats is not None:
+            stats.record(1, len(frontier.frontier))
+
+
+def shortest_path_bidirectional(source, target, max_depth=7, stats=None):
+    """
+    Returns the same length of path as shortest_path, but runs two
+    breadth-first searches, one from the source and one from the target,
+    always expanding whichever has the smaller frontier, and joins
+    them where they meet.
+
+    If no possible path within max_depth, returns None.
+    """
+    if graph is not None:
+        return graph.shortest_path_bidirectional(source, target, max_depth,
+                                                 stats)
+    if source == target:
+        return []
+
+    # Maps each reached person to (movie_id, previous person_id, depth)
+    forward = {source: (None, None, 0)}
+    backward = {target: (None, None, 0)}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    depth = 0
+    while forward_frontier and backward_frontier and depth < max_depth:
+        expanded = min(len(forward_frontier), len(backward_frontier))
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meet = expand_level(
+                forward_frontier, forward, backward)
+        else:
+            backward_frontier, meet = expand_level(
+                backward_frontier, backward, forward)
+        depth += 1
+        if stats is not None:
+            stats.record(expanded,
+                         len(forward_frontier) + len(backward_frontier))
+
+        if meet is not None:
+            # Walk back to the source, then forward to the target
+            path = []
+            person_id = meet
+            while forward[person_id][1] is not None:
+                movie_id, previous, _ = forward[person_id]
+                path.append((movie_id, person_id))
+                person_id = previous
+            path.reverse()
+            person_id = meet
+            while backward[person_id][1] is not None:
+                movie_id, person_id, _ = backward[person_id]
+                path.append((movie_id, person_id))
+            return path
+    return None
+
+
+def expand_level(frontier, reached, other):
+    """
+    Expands one whole level of one side of a bidirectional search.
+
+    Returns the next frontier and the person_id where both searches meet
+    along the shortest total path, or None if they don't meet yet.
+    """
+    next_frontier = []
+    meet, best = None, None
+    for person_id in frontier:
+        depth = reached[person_id][2] + 1
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in reached:
+                continue
+            reached[neighbor] = (movie_id, person_id, depth)
+            next_frontier.append(neighbor)
+            if neighbor in other:
+                total = depth + other[neighbor][2]
+                if meet is None or total < best:
+                    meet, best = neighbor, total
+    return next_frontier, meet
 
 
 def person_id_for_name(name):
@@ -131,13 +286,17 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
+        suggestions = suggest_names(name)
+        if suggestions:
+            print("Did you mean: " + ", ".join(
+                suggestion["name"] for suggestion in suggestions) + "?")
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            person = person_info(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -152,11 +311,72 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns the list of IMDB ids for a person's name.
+    """
+    if graph is not None:
+        return graph.person_ids_for_name(name)
+    return list(names.get(name.lower(), set()))
+
+
+def suggest_names(query, limit=5):
+    """
+    Returns up to limit ranked candidates for a partial or misspelled
+    name, as dictionaries of name, person_ids, match ("exact", "prefix" or
+    "fuzzy") and edit distance.
+    """
+    index = name_index
+    if index is None:
+        index = build_name_index()
+    return index.search(query, limit)
+
+
+def build_name_index():
+    """
+    Builds the name index of the loaded people, unless it is already
+    built or mapped from the snapshot, and returns it.
+    """
+    global name_index
+    with name_index_lock:
+        if name_index is None and graph is not None:
+            name_index = graph.name_search
+        if name_index is None:
+            if graph is not None:
+                people_names = ((graph.person_names[p], graph.person_ids[p])
+                                for p in range(len(graph.person_ids)))
+            else:
+                people_names = ((person["name"], person_id)
+                                for person_id, person in people.items())
+            name_index = NameIndex(people_names)
+        return name_index
+
+
+def person_info(person_id):
+    """
+    Returns a dictionary with the name and birth of a person.
+    """
+    if graph is not None:
+        return graph.person(person_id)
+    return people[person_id]
+
+
+def movie_info(movie_id):
+    """
+    Returns a dictionary with the title and year of a movie.
+    """
+    if graph is not None:
+        return graph.movie(movie_id)
+    return movies[movie_id]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,534 @@
+"""
+Compact graph backend for degrees.py.
+
+Person and movie IDs are interned to dense integers, and the bipartite
+person-movie graph is stored CSR-style: an offsets array per side plus one
+flat array of neighbor indices. The movies of person p are
+
+    person_movies[person_offsets[p]:person_offsets[p + 1]]
+
+and the stars of movie m are found the same way in movie_stars.
+"""
+
+import argparse
+import csv
+import sys
+import time
+from array import array
+from collections import deque
+from functools import lru_cache
+from itertools import chain, islice, repeat
+
+# Typecode used for all index arrays (signed 32 bit)
+INDEX = "i"
+
+
+class CompactGraph():
+    def __init__(self, births=True, years=True):
+        # Index -> IMDB id, and the reverse mapping
+        self.person_ids = []
+        self.person_index = {}
+        self.movie_ids = []
+        self.movie_index = {}
+
+        # Details, indexed by person / movie index (births and years are
+        # None when not loaded)
+        self.person_names = []
+        self.person_births = [] if births else None
+        self.movie_titles = []
+        self.movie_years = [] if years else None
+
+        # Maps lowercase names to a list of person indices
+        self.name_index = {}
+
+        # Prefix and fuzzy nameindex.NameIndex, when mapped from a snapshot
+        self.name_search = None
+
+        # CSR adjacency in both directions
+        self.person_offsets = array(INDEX, [0])
+        self.person_movies = array(INDEX)
+        self.movie_offsets = array(INDEX, [0])
+        self.movie_stars = array(INDEX)
+
+        # Optional co-star index: distinct co-stars of each person, each
+        # with one representative movie, either precomputed in CSR form
+        # or computed on demand behind a bounded LRU cache
+        self.costar_offsets = None
+        self.costar_people = None
+        self.costar_movies = None
+        self.costar_cache = None
+
+    def add_person(self, person_id, name, birth=None):
+        """
+        Interns a person and returns its index.
+        """
+        index = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_index[person_id] = index
+        self.person_names.append(name)
+        if self.person_births is not None:
+            self.person_births.append(birth)
+        self.name_index.setdefault(name.lower(), []).append(index)
+        return index
+
+    def add_movie(self, movie_id, title, year=None):
+        """
+        Interns a movie and returns its index.
+        """
+        index = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_index[movie_id] = index
+        self.movie_titles.append(title)
+        if self.movie_years is not None:
+            self.movie_years.append(year)
+        return index
+
+    def build(self, edge_people, edge_movies):
+        """
+        Builds both CSR adjacencies from parallel arrays of
+        (person index, movie index) edges.
+        """
+        self.person_offsets, self.person_movies = csr(
+            len(self.person_ids), edge_people, edge_movies)
+        self.movie_offsets, self.movie_stars = csr(
+            len(self.movie_ids), edge_movies, edge_people)
+
+    def person_count(self):
+        return len(self.person_offsets) - 1
+
+    def movie_count(self):
+        return len(self.movie_offsets) - 1
+
+    def movies_for(self, p):
+        """
+        Returns the movie indices of person index p.
+        """
+        offsets = self.person_offsets
+        return self.person_movies[offsets[p]:offsets[p + 1]]
+
+    def stars_for(self, m):
+        """
+        Returns the person indices of movie index m.
+        """
+        offsets = self.movie_offsets
+        return self.movie_stars[offsets[m]:offsets[m + 1]]
+
+    def costars(self, p):
+        """
+        Returns an iterator of (person index, movie index) pairs for the
+        people who starred with person index p.
+
+        With a co-star index or cache, each co-star appears once with one
+        representative movie. Without one, the movies of p are walked
+        directly and co-stars may repeat.
+        """
+        if self.costar_offsets is not None:
+            start, end = self.costar_offsets[p], self.costar_offsets[p + 1]
+            return zip(self.costar_people[start:end],
+                       self.costar_movies[start:end])
+        if self.costar_cache is not None:
+            return zip(*self.costar_cache(p))
+        movie_offsets, movie_stars = self.movie_offsets, self.movie_stars
+        return chain.from_iterable(
+            zip(movie_stars[movie_offsets[m]:movie_offsets[m + 1]], repeat(m))
+            for m in self.movies_for(p))
+
+    def compute_costars(self, p):
+        """
+        Walks the movies of person index p to find its distinct co-stars,
+        returned as parallel (people, movies) arrays.
+        """
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_stars = self.movie_offsets, self.movie_stars
+
+        found = {p: -1}
+        for i in range(person_offsets[p], person_offsets[p + 1]):
+            m = person_movies[i]
+            for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                q = movie_stars[j]
+                if q not in found:
+                    found[q] = m
+        del found[p]
+        return array(INDEX, found.keys()), array(INDEX, found.values())
+
+    def build_costar_index(self):
+        """
+        Precomputes the co-stars of every person into CSR arrays.
+        """
+        offsets = array(INDEX, [0])
+        people = array(INDEX)
+        movies = array(INDEX)
+        for p in range(self.person_count()):
+            q, m = self.compute_costars(p)
+            people.extend(q)
+            movies.extend(m)
+            offsets.append(len(people))
+        self.costar_offsets = offsets
+        self.costar_people = people
+        self.costar_movies = movies
+
+    def cache_costars(self, maxsize):
+        """
+        Computes co-stars on demand, keeping the maxsize most recently
+        used people in memory.
+        """
+        self.costar_cache = lru_cache(maxsize=maxsize)(self.compute_costars)
+
+    def person(self, person_id):
+        """
+        Returns a dictionary of name and birth for a person_id, in the
+        same shape as the entries of degrees.people.
+        """
+        p = self.person_index[person_id]
+        births = self.person_births
+        return {"name": self.person_names[p],
+                "birth": births[p] if births is not None else None}
+
+    def movie(self, movie_id):
+        """
+        Returns a dictionary of title and year for a movie_id, in the
+        same shape as the entries of degrees.movies.
+        """
+        m = self.movie_index[movie_id]
+        years = self.movie_years
+        return {"title": self.movie_titles[m],
+                "year": years[m] if years is not None else None}
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the list of person_ids with a given (case insensitive) name.
+        """
+        indices = self.name_index.get(name.lower(), [])
+        return [self.person_ids[p] for p in indices]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for m in self.movies_for(self.person_index[person_id]):
+            movie_id = self.movie_ids[m]
+            for q in self.stars_for(m):
+                neighbors.add((movie_id, self.person_ids[q]))
+        return neighbors
+
+    def shortest_path(self, source, target, max_depth=7, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target, searching at most
+        max_depth degrees away. stats, if given, is a util.SearchStats.
+
+        If no possible path, returns None.
+        """
+        s = self.person_index.get(source)
+        t = self.person_index.get(target)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return []
+
+        n = self.person_count()
+        depth = array(INDEX, [-1]) * n
+        parent = array(INDEX, [-1]) * n
+        via = array(INDEX, [-1]) * n
+        depth[s] = 0
+
+        costars = self.costars
+        queue = deque([s])
+        while queue:
+            p = queue.popleft()
+            if stats is not None:
+                stats.record(1, len(queue) + 1)
+            d = depth[p]
+            if d >= max_depth:
+                continue
+            for q, m in costars(p):
+                if depth[q] >= 0:
+                    continue
+                depth[q] = d + 1
+                parent[q] = p
+                via[q] = m
+
+                # BFS reaches the target first along a shortest path
+                if q == t:
+                    return self.path_to(t, parent, via)
+                queue.append(q)
+        return None
+
+    def single_source(self, s, max_depth=None):
+        """
+        Breadth-first search from person index s over the whole graph.
+
+        Returns (depth, parent, via) arrays indexed by person: the number
+        of degrees from s (-1 if unreachable), and the previous person and
+        movie on one shortest path back to s (-1 for s itself).
+        """
+        n = self.person_count()
+        depth = array(INDEX, [-1]) * n
+        parent = array(INDEX, [-1]) * n
+        via = array(INDEX, [-1]) * n
+        depth[s] = 0
+
+        costars = self.costars
+        frontier = [s]
+        d = 0
+        while frontier and (max_depth is None or d < max_depth):
+            d += 1
+            next_frontier = []
+            for p in frontier:
+                for q, m in costars(p):
+                    if depth[q] < 0:
+                        depth[q] = d
+                        parent[q] = p
+                        via[q] = m
+                        next_frontier.append(q)
+            frontier = next_frontier
+        return depth, parent, via
+
+    def shortest_path_bidirectional(self, source, target, max_depth=7,
+                                    stats=None):
+        """
+        Same as shortest_path, but searches from both the source and the
+        target, always expanding the side with the smaller frontier.
+        """
+        s = self.person_index.get(source)
+        t = self.person_index.get(target)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return []
+
+        n = self.person_count()
+        forward = (array(INDEX, [-1]) * n, array(INDEX, [-1]) * n,
+                   array(INDEX, [-1]) * n)
+        backward = (array(INDEX, [-1]) * n, array(INDEX, [-1]) * n,
+                    array(INDEX, [-1]) * n)
+        forward[0][s] = 0
+        backward[0][t] = 0
+        forward_frontier = [s]
+        backward_frontier = [t]
+
+        depth = 0
+        while forward_frontier and backward_frontier and depth < max_depth:
+            expanded = min(len(forward_frontier), len(backward_frontier))
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meet = self.expand_level(
+                    forward_frontier, forward, backward)
+            else:
+                backward_frontier, meet = self.expand_level(
+                    backward_frontier, backward, forward)
+            depth += 1
+            if stats is not None:
+                stats.record(expanded,
+                             len(forward_frontier) + len(backward_frontier))
+            if meet >= 0:
+                path = self.path_to(meet, forward[1], forward[2])
+                p = meet
+                while backward[1][p] >= 0:
+                    path.append((self.movie_ids[backward[2][p]],
+                                 self.person_ids[backward[1][p]]))
+                    p = backward[1][p]
+                return path
+        return None
+
+    def expand_level(self, frontier, side, other):
+        """
+        Expands one whole BFS level of one side of a bidirectional search.
+        side and other are (depth, parent, via) arrays.
+
+        Returns the next frontier and the person index where the two
+        searches meet along the shortest path, or -1.
+        """
+        depth, parent, via = side
+        other_depth = other[0]
+        costars = self.costars
+        next_frontier = []
+        meet, best = -1, -1
+        for p in frontier:
+            d = depth[p] + 1
+            for q, m in costars(p):
+                if depth[q] >= 0:
+                    continue
+                depth[q] = d
+                parent[q] = p
+                via[q] = m
+                next_frontier.append(q)
+
+                # Keep the meeting point with the shortest total path
+                if other_depth[q] >= 0:
+                    total = d + other_depth[q]
+                    if meet < 0 or total < best:
+                        meet, best = q, total
+        return next_frontier, meet
+
+    def path_to(self, t, parent, via):
+        """
+        Follows parent and via (movie) arrays back from person index t,
+        returning the (movie_id, person_id) path that leads to it.
+        """
+        path = []
+        while parent[t] >= 0:
+            path.append((self.movie_ids[via[t]], self.person_ids[t]))
+            t = parent[t]
+        path.reverse()
+        return path
+
+
+def csr(count, keys, values):
+    """
+    Groups values by key into CSR offsets and a flat neighbor array,
+    dropping duplicate (key, value) edges.
+    """
+    offsets = array(INDEX, [0]) * (count + 1)
+    for k in keys:
+        offsets[k + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    # Counting sort of the values into their key's slot
+    cursor = offsets[:-1]
+    flat = array(INDEX, [0]) * len(keys)
+    for k, v in zip(keys, values):
+        flat[cursor[k]] = v
+        cursor[k] += 1
+
+    # Collapse duplicate edges, like the sets in the dict backend do
+    unique_offsets = array(INDEX, [0]) * (count + 1)
+    unique = array(INDEX)
+    for i in range(count):
+        unique.extend(sorted(set(flat[offsets[i]:offsets[i + 1]])))
+        unique_offsets[i + 1] = len(unique)
+    return unique_offsets, unique
+
+
+def load_graph(directory):
+    """
+    Load data from CSV files into a CompactGraph.
+    """
+    return stream_graph(directory, include_birth=True, include_year=True)
+
+
+def stream_graph(directory, include_birth=False, include_year=False,
+                 chunk_size=100000, report=None):
+    """
+    Load data from CSV files into a CompactGraph, reading chunk_size rows
+    at a time and keeping only the columns the graph needs. Birth years
+    of people and release years of movies are dropped unless requested.
+
+    If given, report is called after every chunk with a LoadStats.
+    """
+    graph = CompactGraph(births=include_birth, years=include_year)
+    stats = LoadStats(report)
+
+    # Load people
+    columns = ["id", "name"] + (["birth"] if include_birth else [])
+    for chunk in read_chunks(f"{directory}/people.csv", columns, chunk_size):
+        for row in chunk:
+            graph.add_person(*row)
+        stats.update("people.csv", len(chunk))
+
+    # Load movies
+    columns = ["id", "title"] + (["year"] if include_year else [])
+    for chunk in read_chunks(f"{directory}/movies.csv", columns, chunk_size):
+        for row in chunk:
+            graph.add_movie(*row)
+        stats.update("movies.csv", len(chunk))
+
+    # Load stars, skipping edges to unknown people or movies
+    edge_people = array(INDEX)
+    edge_movies = array(INDEX)
+    person_index, movie_index = graph.person_index, graph.movie_index
+    columns = ["person_id", "movie_id"]
+    for chunk in read_chunks(f"{directory}/stars.csv", columns, chunk_size):
+        for person_id, movie_id in chunk:
+            p = person_index.get(person_id)
+            m = movie_index.get(movie_id)
+            if p is None or m is None:
+                continue
+            edge_people.append(p)
+            edge_movies.append(m)
+        stats.update("stars.csv", len(chunk))
+
+    graph.build(edge_people, edge_movies)
+    stats.update("graph", 0)
+    return graph
+
+
+def read_chunks(path, columns, chunk_size):
+    """
+    Yields lists of up to chunk_size rows of a CSV file, each row a list
+    of the named columns only.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        picks = [header.index(column) for column in columns]
+        while True:
+            chunk = [[row[i] for i in picks]
+                     for row in islice(reader, chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+
+class LoadStats():
+    """
+    Running row count, throughput and peak memory of a load.
+    """
+
+    def __init__(self, report=None):
+        self.report = report
+        self.start = time.perf_counter()
+        self.rows = 0
+        self.stage = None
+
+    def update(self, stage, rows):
+        self.stage = stage
+        self.rows += rows
+        if self.report:
+            self.report(self)
+
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.start
+        return self.rows / elapsed if elapsed else 0.0
+
+    def __str__(self):
+        return (f"{self.stage}: {self.rows} rows, "
+                f"{self.rows_per_second():.0f} rows/s, "
+                f"peak RSS {peak_rss() / 2 ** 20:.1f} MiB")
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process, in bytes, or 0
+    where it isn't available (the resource module is Unix only).
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a degrees dataset "
+                                     "into a compact graph and report on it.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--birth", action="store_true",
+                        help="keep people's birth years")
+    parser.add_argument("--year", action="store_true",
+                        help="keep movies' release years")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    args = parser.parse_args()
+
+    graph = stream_graph(args.directory, args.birth, args.year,
+                         args.chunk_size, report=print)
+    print(f"{graph.person_count()} people, {graph.movie_count()} movies, "
+          f"{len(graph.person_movies)} roles.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Prefix and fuzzy lookup of people by name.
+
+A NameIndex keeps the distinct lowercase names in a sorted list, so
+prefix matches are a bisect away, plus an inverted index from character
+trigrams to names for typo tolerant candidates, which are then ranked by
+edit distance.
+
+Each result says how it matched: "exact", "prefix" (the name starts with
+the query) or "fuzzy", with its edit distance from the query, which for a
+prefix match is the number of characters after the prefix.
+
+The index only reads keys, names, ids and trigrams by position or with
+get, so snapshot.py can stand in read-only tables mapped from a snapshot.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+
+class NameIndex():
+    def __init__(self, people=()):
+        """
+        Builds the index from an iterable of (name, person_id) pairs.
+        """
+        grouped = {}
+        for name, person_id in people:
+            key = name.lower()
+            if key not in grouped:
+                grouped[key] = (name, [])
+            grouped[key][1].append(person_id)
+
+        # Sorted distinct keys, with the display name and ids of each
+        self.keys = sorted(grouped)
+        self.names = [grouped[key][0] for key in self.keys]
+        self.ids = [grouped[key][1] for key in self.keys]
+
+        # Maps each trigram to the positions of the keys containing it
+        postings = {}
+        for position, key in enumerate(self.keys):
+            for gram in set(trigrams(key)):
+                postings.setdefault(gram, array("i")).append(position)
+        self.trigrams = postings
+
+    def entry(self, position, match, distance):
+        return {
+            "name": self.names[position],
+            "person_ids": self.ids[position],
+            "match": match,
+            "distance": distance,
+        }
+
+    def exact(self, name):
+        """
+        Returns the person_ids with exactly this (case insensitive) name.
+        """
+        key = name.lower()
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return self.ids[position]
+        return []
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit names starting with prefix, in sorted order.
+        """
+        key = prefix.lower()
+        matches = []
+        position = bisect_left(self.keys, key)
+        while (position < len(self.keys) and len(matches) < limit
+               and self.keys[position].startswith(key)):
+            distance = len(self.keys[position]) - len(key)
+            matches.append(self.entry(
+                position, "prefix" if distance else "exact", distance))
+            position += 1
+        return matches
+
+    def fuzzy(self, name, limit=10, max_distance=2, candidates=24,
+              max_postings=2000):
+        """
+        Returns up to limit names within max_distance edits of name,
+        closest first.
+
+        Only the candidates names sharing the most trigrams with name are
+        ranked. Trigrams are counted rarest first, and only the first
+        3 * max_distance + 1 of them, since each edit changes at most
+        three trigrams and so any name close enough shares one of those.
+        Trigrams found in more than max_postings names are ignored unless
+        nothing rarer is available.
+        """
+        key = name.lower()
+        postings = sorted((self.trigrams.get(gram, ())
+                           for gram in set(trigrams(key))), key=len)
+        shared = Counter()
+        for i, positions in enumerate(postings[:3 * max_distance + 1]):
+            if len(positions) > max_postings and i > 0:
+                break
+            shared.update(positions)
+
+        ranked = []
+        for position, _ in shared.most_common(candidates):
+            distance = edit_distance(key, self.keys[position], max_distance)
+            if distance <= max_distance:
+                ranked.append((distance, self.keys[position], position))
+        ranked.sort()
+        return [self.entry(position, "fuzzy" if distance else "exact",
+                           distance)
+                for distance, _, position in ranked[:limit]]
+
+    def search(self, query, limit=10):
+        """
+        Returns ranked candidates for a query: prefix matches first
+        (an exact match being the shortest of them), then fuzzy ones.
+        """
+        results = self.prefix(query, limit)
+        if len(results) >= limit:
+            return results
+        seen = {result["name"] for result in results}
+        for result in self.fuzzy(query, limit):
+            if len(results) >= limit:
+                break
+            if result["name"] not in seen:
+                results.append(result)
+        return results
+
+
+def trigrams(key):
+    """
+    Returns the character trigrams of a key, padded at both ends.
+    """
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between a and b, or limit + 1 as
+    soon as it is known to exceed limit.
+
+    Shared prefixes and suffixes are skipped, and only the cells within
+    limit of the diagonal are computed, since no path through the others
+    can cost limit or less.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    # Trim the common prefix and suffix
+    start = 0
+    shorter = min(len(a), len(b))
+    while start < shorter and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shorter - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return min(len(a) + len(b), limit + 1)
+
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        best = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            d = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < d:
+                d = previous[j] + 1
+            if current[j - 1] + 1 < d:
+                d = current[j - 1] + 1
+            current[j] = d
+            if d < best:
+                best = d
+        if best > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
@@ -0,0 +1,211 @@
+"""
+Long-lived query mode for degrees of separation.
+
+Loads the data once, then answers many queries:
+
+    python service.py DIR [--input FILE]     batch, JSON lines out
+    python service.py DIR --http PORT        HTTP endpoint
+    python service.py DIR --socket PATH      Unix socket, JSON lines
+
+Each query is either a JSON object {"source": name, "target": name} or a
+line "source<TAB>target". Each answer is one JSON object with the number
+of degrees and the path, or an "error" (with "candidates" when a name is
+ambiguous or not found).
+"""
+
+import argparse
+import json
+import socketserver
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+
+class QueryError(Exception):
+    def __init__(self, message, candidates=None):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+def resolve(name):
+    """
+    Returns the single person_id for a name, without prompting.
+    """
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 0:
+        raise QueryError(f"person not found: {name}",
+                         degrees.suggest_names(name))
+    if len(person_ids) > 1:
+        candidates = [dict(degrees.person_info(person_id), id=person_id)
+                      for person_id in person_ids]
+        raise QueryError(f"ambiguous name: {name}", candidates)
+    return person_ids[0]
+
+
+def parse_query(line):
+    """
+    Returns (source, target) names from a JSON or tab separated line.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        query = json.loads(line)
+        source, target = query["source"], query["target"]
+    else:
+        source, target = line.split("\t")
+    if not isinstance(source, str) or not isinstance(target, str):
+        raise ValueError("source and target must be names")
+    return source, target
+
+
+def answer(source, target, bidirectional=False):
+    """
+    Returns the JSON-serializable answer for one pair of names.
+    """
+    result = {"source": source, "target": target}
+    try:
+        source_id = resolve(source)
+        target_id = resolve(target)
+    except QueryError as e:
+        result["error"] = str(e)
+        if e.candidates:
+            result["candidates"] = e.candidates
+        return result
+
+    if bidirectional:
+        path = degrees.shortest_path_bidirectional(source_id, target_id)
+    else:
+        path = degrees.shortest_path(source_id, target_id)
+
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+        return result
+    result["degrees"] = len(path)
+    result["path"] = [
+        {
+            "movie_id": movie_id,
+            "movie": degrees.movie_info(movie_id)["title"],
+            "person_id": person_id,
+            "person": degrees.person_info(person_id)["name"],
+        }
+        for movie_id, person_id in path
+    ]
+    return result
+
+
+def answer_line(line, bidirectional=False):
+    """
+    Returns the JSON line answering one query line.
+    """
+    try:
+        source, target = parse_query(line)
+    except (ValueError, KeyError, TypeError):
+        return json.dumps({"error": f"malformed query: {line.strip()}"})
+    return json.dumps(answer(source, target, bidirectional))
+
+
+def run_batch(lines, out, bidirectional=False):
+    """
+    Answers every non-blank query line, writing one JSON line per query.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        out.write(answer_line(line, bidirectional) + "\n")
+        out.flush()
+
+
+def serve_http(port, bidirectional=False):
+    """
+    Serves GET /path?source=...&target=... and POST /path with
+    query lines in the body.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/path":
+                return self.send_error(404)
+            params = parse_qs(url.query)
+            if "source" not in params or "target" not in params:
+                return self.send_error(400, "source and target are required")
+            body = json.dumps(answer(params["source"][0], params["target"][0],
+                                     bidirectional))
+            self.reply(body + "\n")
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/path":
+                return self.send_error(404)
+            length = int(self.headers.get("Content-Length", 0))
+            lines = self.rfile.read(length).decode("utf-8").splitlines()
+            self.reply("".join(answer_line(line, bidirectional) + "\n"
+                               for line in lines if line.strip()))
+
+        def reply(self, body):
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    with ThreadingHTTPServer(("127.0.0.1", port), Handler) as server:
+        print(f"Serving on http://127.0.0.1:{port}/path", file=sys.stderr)
+        server.serve_forever()
+
+
+def serve_socket(path, bidirectional=False):
+    """
+    Serves query lines over a Unix socket, one JSON line per query.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode("utf-8")
+                if not line.strip():
+                    continue
+                self.wfile.write(
+                    (answer_line(line, bidirectional) + "\n").encode("utf-8"))
+
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Serving on {path}", file=sys.stderr)
+        server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees of separation "
+                                     "query service.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--snapshot", action="store_true")
+    parser.add_argument("--bidirectional", action="store_true")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--input", help="file of queries (default: stdin)")
+    mode.add_argument("--http", type=int, metavar="PORT")
+    mode.add_argument("--socket", metavar="PATH")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, compact=args.compact,
+                      snapshot=args.snapshot, index_names=True)
+    print("Data loaded.", file=sys.stderr)
+
+    if args.http is not None:
+        serve_http(args.http, args.bidirectional)
+    elif args.socket:
+        serve_socket(args.socket, args.bidirectional)
+    elif args.input:
+        with open(args.input, encoding="utf-8") as f:
+            run_batch(f, sys.stdout, args.bidirectional)
+    else:
+        run_batch(sys.stdin, sys.stdout, args.bidirectional)
+
+
+if __name__ == "__main__":
+    main()
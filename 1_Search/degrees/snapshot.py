@@ -0,0 +1,361 @@
+"""
+Binary snapshot cache for the degrees dataset.
+
+A snapshot holds a CompactGraph as raw arrays: the CSR adjacency, the
+string tables (IDs, names, titles, ...) as UTF-8 blobs with offsets, and
+sorted permutations used to look up IDs and names by binary search. It is
+opened with mmap, so loading costs no parsing and no per-row objects.
+
+It also holds the prefix and fuzzy name index of nameindex.py: the sorted
+distinct names, the people of each, and the trigram postings, so the
+index costs nothing to build once the snapshot exists.
+
+The snapshot records the size and modification time of the CSV files it
+was built from, and is ignored (and rebuilt) once any of them change.
+
+Usage: python snapshot.py [directory]
+"""
+
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+
+from graph import INDEX, CompactGraph, load_graph
+from nameindex import NameIndex
+
+MAGIC = b"DEGSNAP2"
+FILENAME = "graph.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Sections are aligned so each one can be cast in place
+ALIGN = 8
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 blob plus offsets.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0 or i >= len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class SortedIndex():
+    """
+    Read-only mapping from key to index, by binary search over a
+    permutation of the indices sorted by key.
+
+    With unique=False, get returns the list of every matching index.
+    """
+
+    def __init__(self, strings, order, unique=True, fold=None):
+        self.strings = strings
+        self.order = order
+        self.unique = unique
+        self.fold = fold
+
+    def key(self, i):
+        s = self.strings[i]
+        return self.fold(s) if self.fold else s
+
+    def matches(self, key):
+        order = self.order
+        start = bisect_left(order, key, key=self.key)
+        end = start
+        while end < len(order) and self.key(order[end]) == key:
+            end += 1
+        return [order[i] for i in range(start, end)]
+
+    def get(self, key, default=None):
+        found = self.matches(key)
+        if not found:
+            return default
+        return found[0] if self.unique else found
+
+    def __getitem__(self, key):
+        found = self.get(key)
+        if found is None:
+            raise KeyError(key)
+        return found
+
+    def __contains__(self, key):
+        return bool(self.matches(key))
+
+
+class Grouped():
+    """
+    Read-only sequence whose i-th item is build applied to the i-th group
+    values[offsets[i]:offsets[i + 1]] of a CSR array.
+    """
+
+    def __init__(self, offsets, values, build):
+        self.offsets = offsets
+        self.values = values
+        self.build = build
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0 or i >= len(self):
+            raise IndexError("group index out of range")
+        return self.build(self.values[self.offsets[i]:self.offsets[i + 1]])
+
+
+class Postings():
+    """
+    Read-only mapping from the sorted strings of a StringTable to groups
+    of a CSR array. The dictionary from string to position is built on
+    first use, as bisecting the table would decode a string per step.
+    """
+
+    def __init__(self, keys, offsets, values):
+        self.keys = keys
+        self.offsets = offsets
+        self.values = values
+        self.positions = None
+
+    def get(self, key, default=None):
+        if self.positions is None:
+            self.positions = {self.keys[i]: i for i in range(len(self.keys))}
+        i = self.positions.get(key)
+        if i is None:
+            return default
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def source_stamps(directory):
+    """
+    Returns the size and mtime of each source CSV file.
+    """
+    stamps = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def string_table(strings):
+    """
+    Returns the (blob, offsets) arrays for a list of strings.
+    """
+    blob = bytearray()
+    offsets = array("q", [0])
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return bytes(blob), offsets
+
+
+def write_snapshot(graph, directory, path=None):
+    """
+    Writes graph to a snapshot file, stamped with directory's CSV files.
+    """
+    path = path or snapshot_path(directory)
+    person_order = array(INDEX, sorted(range(len(graph.person_ids)),
+                                       key=graph.person_ids.__getitem__))
+    movie_order = array(INDEX, sorted(range(len(graph.movie_ids)),
+                                      key=graph.movie_ids.__getitem__))
+    name_order = array(INDEX, sorted(range(len(graph.person_names)),
+                                     key=lambda p: graph.person_names[p].lower()))
+
+    # Name index over person indices, its groups and postings in CSR form
+    names = NameIndex((graph.person_names[p], p)
+                      for p in range(len(graph.person_names)))
+    name_offsets, name_people = array("q", [0]), array(INDEX)
+    for group in names.ids:
+        name_people.extend(group)
+        name_offsets.append(len(name_people))
+    grams = sorted(names.trigrams)
+    gram_offsets, gram_postings = array("q", [0]), array(INDEX)
+    for gram in grams:
+        gram_postings.extend(names.trigrams[gram])
+        gram_offsets.append(len(gram_postings))
+
+    sections = {
+        "person_offsets": graph.person_offsets,
+        "person_movies": graph.person_movies,
+        "movie_offsets": graph.movie_offsets,
+        "movie_stars": graph.movie_stars,
+        "person_order": person_order,
+        "movie_order": movie_order,
+        "name_order": name_order,
+        "name_offsets": name_offsets,
+        "name_people": name_people,
+        "gram_offsets": gram_offsets,
+        "gram_postings": gram_postings,
+    }
+    for field in ("person_ids", "person_names", "person_births",
+                  "movie_ids", "movie_titles", "movie_years"):
+        strings = getattr(graph, field)
+        if strings is None:
+            # Column not loaded
+            strings = [""] * len(graph.person_ids if field.startswith(
+                "person") else graph.movie_ids)
+        blob, offsets = string_table(strings)
+        sections[f"{field}.blob"] = blob
+        sections[f"{field}.offsets"] = offsets
+    for field, strings in (("name_keys", names.keys), ("grams", grams)):
+        blob, offsets = string_table(strings)
+        sections[f"{field}.blob"] = blob
+        sections[f"{field}.offsets"] = offsets
+
+    # Lay the sections out one after another
+    layout = {}
+    position = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else "B"
+        size = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        layout[name] = [position, size, typecode]
+        position += size + (-size % ALIGN)
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "sources": source_stamps(directory),
+        "sections": layout,
+    }).encode("utf-8")
+    data_start = len(MAGIC) + 8 + len(header)
+    data_start += -data_start % ALIGN
+
+    # Write to a temporary file first so readers never see half a snapshot
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        f.write(bytes(data_start - f.tell()))
+        for name, data in sections.items():
+            offset, size, _ = layout[name]
+            f.write(bytes(data_start + offset - f.tell()))
+            f.write(data if isinstance(data, bytes) else data.tobytes())
+    os.replace(temporary, path)
+
+
+def read_header(view, directory):
+    """
+    Returns the header of a mapped snapshot and the position its sections
+    start at, or None if the snapshot is stale, truncated or corrupt.
+    """
+    header_start = len(MAGIC) + 8
+    if len(view) < header_start or bytes(view[:len(MAGIC)]) != MAGIC:
+        return None
+    header_size = int.from_bytes(view[len(MAGIC):header_start], "little")
+    data_start = header_start + header_size
+    data_start += -data_start % ALIGN
+    try:
+        header = json.loads(bytes(view[header_start:header_start
+                                       + header_size]))
+        if (header["byteorder"] != sys.byteorder
+                or header["sources"] != source_stamps(directory)):
+            return None
+        end = max((offset + size
+                   for offset, size, _ in header["sections"].values()),
+                  default=0)
+    except (ValueError, KeyError, TypeError):
+        return None
+    if data_start + end > len(view):
+        return None
+    return header, data_start
+
+
+def open_snapshot(directory, path=None):
+    """
+    Opens the snapshot for directory as a CompactGraph.
+
+    Returns None if there is no snapshot, or if it is stale, truncated or
+    corrupt.
+    """
+    path = path or snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    view = memoryview(mapped)
+    found = read_header(view, directory)
+    if found is None:
+        # Unmap it, so that it can be replaced
+        view.release()
+        mapped.close()
+        return None
+    header, data_start = found
+
+    def section(name):
+        offset, size, typecode = header["sections"][name]
+        start = data_start + offset
+        return view[start:start + size].cast(typecode)
+
+    graph = CompactGraph()
+    graph.snapshot = mapped
+    graph.person_offsets = section("person_offsets")
+    graph.person_movies = section("person_movies")
+    graph.movie_offsets = section("movie_offsets")
+    graph.movie_stars = section("movie_stars")
+    for field in ("person_ids", "person_names", "person_births",
+                  "movie_ids", "movie_titles", "movie_years"):
+        setattr(graph, field, StringTable(section(f"{field}.blob"),
+                                          section(f"{field}.offsets")))
+    graph.person_index = SortedIndex(graph.person_ids,
+                                     section("person_order"))
+    graph.movie_index = SortedIndex(graph.movie_ids, section("movie_order"))
+    graph.name_index = SortedIndex(graph.person_names, section("name_order"),
+                                   unique=False, fold=str.lower)
+
+    names = NameIndex()
+    names.keys = StringTable(section("name_keys.blob"),
+                             section("name_keys.offsets"))
+    name_offsets = section("name_offsets")
+    name_people = section("name_people")
+    names.names = Grouped(name_offsets, name_people,
+                          lambda group: graph.person_names[group[0]])
+    names.ids = Grouped(name_offsets, name_people,
+                        lambda group: [graph.person_ids[p] for p in group])
+    names.trigrams = Postings(StringTable(section("grams.blob"),
+                                          section("grams.offsets")),
+                              section("gram_offsets"),
+                              section("gram_postings"))
+    graph.name_search = names
+    return graph
+
+
+def load_snapshot(directory, path=None):
+    """
+    Opens the snapshot for directory, building it from the CSV files
+    first if it is missing or stale.
+    """
+    graph = open_snapshot(directory, path)
+    if graph is None:
+        write_snapshot(load_graph(directory), directory, path)
+        graph = open_snapshot(directory, path)
+    return graph
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    print("Loading data...")
+    write_snapshot(load_graph(directory), directory)
+    print(f"Snapshot written to {snapshot_path(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action, depth):
         self.state = state
@@ -37,3 +40,63 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Same interface as StackFrontier, but backed by a deque and a count of
+    the states in it, so add, remove and contains_state are all O(1).
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return self.discard(self.frontier.pop())
+
+    def discard(self, node):
+        """Drops one occurrence of node's state from the membership count."""
+        count = self.states[node.state]
+        if count == 1:
+            del self.states[node.state]
+        else:
+            self.states[node.state] = count - 1
+        return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return self.discard(self.frontier.popleft())
+
+
+class SearchStats():
+    """
+    Counters a search fills in when one is passed to it.
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.frontier_peak = 0
+
+    def record(self, expanded, frontier_size):
+        self.expanded += expanded
+        if frontier_size > self.frontier_peak:
+            self.frontier_peak = frontier_size
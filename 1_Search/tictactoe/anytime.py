@@ -0,0 +1,106 @@
+"""
+Anytime search for the tic-tac-toe AI.
+
+AnytimeSearch deepens an alpha-beta search on an m,n,k game one move at a
+time until its time budget runs out, the game is searched to the end, or
+it is cancelled, and always has the best move found so far. It can run in
+a background thread, so a UI can keep drawing while the AI thinks.
+"""
+
+import threading
+import time
+
+from mnk import WIN
+
+
+class AnytimeSearch():
+    def __init__(self, game, position, seconds, max_depth=None, book=None):
+        """
+        Prepares a search of position in game (an mnk.MNKGame) for at
+        most seconds. book, if given, is tried first: a function from a
+        position to a move, or to None when it doesn't know one.
+        """
+        self.game = game
+        self.position = position
+        self.seconds = seconds
+        self.max_depth = max_depth
+        self.book = book
+
+        # Best move so far, and the deepest fully searched depth
+        self.best_move = None
+        self.depth = 0
+
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.thread = None
+
+    def run(self):
+        """
+        Searches until the deadline, and returns the best move found.
+        """
+        try:
+            self.deepen()
+        finally:
+            self.finished.set()
+        return self.best_move
+
+    def deepen(self):
+        game, position = self.game, self.position
+        if game.terminal(position):
+            return
+        if self.book is not None:
+            move = self.book(position)
+            if move is not None:
+                self.best_move = move
+                return
+
+        deadline = time.monotonic() + self.seconds
+
+        def stop():
+            return self.cancelled.is_set() or time.monotonic() > deadline
+
+        # Searching deeper than the empty cells left cannot change anything
+        remaining = game.size - position.moves
+        max_depth = min(self.max_depth or remaining, remaining)
+        self.best_move = game.actions(position)[0]
+
+        for depth in range(1, max_depth + 1):
+            move, value, complete = game.search(position, depth, stop,
+                                                first=self.best_move)
+
+            # A partial search started with the previous best move, so its
+            # choice is at least as well informed
+            self.best_move = move
+            if not complete:
+                return
+            self.depth = depth
+
+            # Stop once the game is decided either way
+            if abs(value) >= WIN - game.size:
+                return
+
+    def start(self):
+        """
+        Runs the search in a background thread.
+        """
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """
+        Asks the search to stop as soon as possible. best_move stays valid.
+        """
+        self.cancelled.set()
+
+    def done(self):
+        """
+        Checks if the search has finished.
+        """
+        return self.finished.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits for a background search to finish and returns its move.
+        """
+        self.finished.wait(timeout)
+        return self.best_move
@@ -0,0 +1,73 @@
+"""
+Compares the full minimax search with alpha-beta pruning and with the
+symmetry-folded transposition table, and with the bitboard engine.
+
+For a set of positions, runs each search and reports the positions
+visited and time taken by each, checking that the moves they pick have
+the same game-theoretic value.
+"""
+
+import time
+
+import bitboard
+import tictactoe as ttt
+
+X, O, EMPTY = ttt.X, ttt.O, ttt.EMPTY
+
+POSITIONS = {
+    "empty board": ttt.initial_state(),
+    "X in corner": [[X, EMPTY, EMPTY],
+                    [EMPTY, EMPTY, EMPTY],
+                    [EMPTY, EMPTY, EMPTY]],
+    "X center, O edge": [[EMPTY, O, EMPTY],
+                         [EMPTY, X, EMPTY],
+                         [EMPTY, EMPTY, EMPTY]],
+    "midgame": [[X, O, EMPTY],
+                [EMPTY, X, EMPTY],
+                [EMPTY, EMPTY, O]],
+}
+
+
+def value(board):
+    """
+    Returns the game-theoretic value of a board, by full search.
+    """
+    if ttt.player(board) == X:
+        return ttt.max_value(board)
+    return ttt.min_value(board)
+
+
+def measure(search, board, module=ttt):
+    """
+    Returns (move, positions visited, seconds) for one search, whose
+    positions are counted in module.nodes_searched.
+    """
+    module.nodes_searched = 0
+    start = time.perf_counter()
+    move = search(board)
+    return move, module.nodes_searched, time.perf_counter() - start
+
+
+def main():
+    # Measure the searches, not the solved-game book
+    ttt.book = None
+
+    for name, board in POSITIONS.items():
+        print(name)
+        values = set()
+        ttt.table.clear()
+        bitboard.values.clear()
+        for label, search, module in (("minimax", ttt.minimax, ttt),
+                                      ("alpha-beta", ttt.alphabeta, ttt),
+                                      ("table", ttt.minimax_cached, ttt),
+                                      ("bitboard", bitboard.minimax, bitboard)):
+            move, nodes, seconds = measure(search, board, module)
+            values.add(value(ttt.result(board, move)))
+            print(f"    {label:10} move {move} "
+                  f"{nodes:8} positions {seconds:8.3f}s")
+        if len(values) != 1:
+            raise SystemExit("Searches disagree on the value of the position.")
+
+
+if __name__ == "__main__":
+    main()
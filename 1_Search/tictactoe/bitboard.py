@@ -0,0 +1,187 @@
+"""
+Tic Tac Toe on bitboards
+
+A state is a pair of 9 bit integers (x, o), one bit per cell, with cell
+(i, j) at bit 3 * i + j. Wins are found by table lookup over all 512 bit
+patterns, and moves by walking the set bits of the empty cells.
+
+The functions mirror the API of tictactoe.py on states, and from_board,
+to_board and minimax adapt to its nested list boards.
+"""
+
+import math
+
+from tictactoe import X, O, EMPTY
+
+FULL = 0b111111111
+
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+
+# Whether each of the 512 bit patterns contains a line, and its popcount
+WINNING = bytes(any(bits & mask == mask for mask in WIN_MASKS)
+                for bits in range(512))
+POPCOUNT = bytes(bin(bits).count("1") for bits in range(512))
+
+# Order moves are searched in: center, then corners, then edges
+MOVE_ORDER = tuple(1 << cell for cell in (4, 0, 2, 6, 8, 1, 3, 5, 7))
+
+# Number of positions visited by searches, for benchmarking
+nodes_searched = 0
+
+# Maps states to their game-theoretic value
+values = {}
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return (0, 0)
+
+
+def player(state):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = state
+    return X if POPCOUNT[x] == POPCOUNT[o] else O
+
+
+def actions(state):
+    """
+    Returns list of all possible actions [i, j] available on the board.
+    """
+    x, o = state
+    empty = ~(x | o) & FULL
+    moves = []
+    while empty:
+        low = empty & -empty
+        moves.append(list(divmod(low.bit_length() - 1, 3)))
+        empty ^= low
+    return moves
+
+
+def result(state, action):
+    """
+    Returns the state that results from making move (i, j) on the board.
+    """
+    bit = 1 << (3 * action[0] + action[1])
+    x, o = state
+    if (x | o) & bit:
+        raise ValueError("Spot already occupied")
+    if POPCOUNT[x] == POPCOUNT[o]:
+        return (x | bit, o)
+    return (x, o | bit)
+
+
+def winner(state):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = state
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+
+def terminal(state):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = state
+    return bool(WINNING[x] or WINNING[o]) or (x | o) == FULL
+
+
+def utility(state):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = state
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
+
+
+def value(state):
+    """
+    Returns the game-theoretic value of a state, searching each state
+    once per process with alpha-beta over the remaining moves.
+    """
+    global nodes_searched
+    if state in values:
+        return values[state]
+    nodes_searched += 1
+
+    x, o = state
+    if WINNING[x]:
+        v = 1
+    elif WINNING[o]:
+        v = -1
+    elif (x | o) == FULL:
+        v = 0
+    else:
+        empty = ~(x | o) & FULL
+        x_to_move = POPCOUNT[x] == POPCOUNT[o]
+        v = -math.inf if x_to_move else math.inf
+        for bit in MOVE_ORDER:
+            if not empty & bit:
+                continue
+            if x_to_move:
+                v = max(v, value((x | bit, o)))
+                if v == 1:
+                    break
+            else:
+                v = min(v, value((x, o | bit)))
+                if v == -1:
+                    break
+    values[state] = v
+    return v
+
+
+def best_action(state):
+    """
+    Returns the optimal action [i, j] for the current player.
+    """
+    if terminal(state):
+        return None
+    choose = max if player(state) == X else min
+    return choose(actions(state),
+                  key=lambda action: value(result(state, action)))
+
+
+def from_board(board):
+    """
+    Returns the state for a tictactoe.py board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """
+    Returns the tictactoe.py board for a state.
+    """
+    x, o = state
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def minimax(board):
+    """
+    Drop-in replacement for tictactoe.minimax, searching on bitboards.
+    """
+    return best_action(from_board(board))
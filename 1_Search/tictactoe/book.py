@@ -0,0 +1,61 @@
+"""
+Generates the solved-game book for tic-tac-toe.
+
+Enumerates every position reachable from initial_state() and writes the
+optimal move for each one to tictactoe.BOOK_FILE, one byte per board
+index (see tictactoe.board_index). tictactoe.minimax then answers from
+the book without searching.
+
+Usage: python book.py [path]
+"""
+
+import sys
+
+import tictactoe as ttt
+
+
+def reachable(board=None, seen=None):
+    """
+    Returns a dictionary of board index -> board for every position
+    reachable from board (the initial state by default).
+    """
+    if board is None:
+        board = ttt.initial_state()
+    if seen is None:
+        seen = {}
+    index = ttt.board_index(board)
+    if index in seen:
+        return seen
+    seen[index] = board
+    if not ttt.terminal(board):
+        for action in ttt.actions(board):
+            reachable(ttt.result(board, action), seen)
+    return seen
+
+
+def generate():
+    """
+    Returns the book contents, and the number of reachable positions.
+    """
+    positions = reachable()
+    data = bytearray([ttt.NO_MOVE]) * ttt.BOOK_SIZE
+    for index, board in positions.items():
+        if not ttt.terminal(board):
+            i, j = ttt.minimax_cached(board)
+            data[index] = 3 * i + j
+    return bytes(data), len(positions)
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_FILE
+
+    data, count = generate()
+    with open(path, "wb") as f:
+        f.write(data)
+    print(f"{count} positions, book written to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+m,n,k games: tic-tac-toe on any rows x columns board, won with k in a row.
+
+Positions carry their move count, last move and winner, so the player to
+move is known without scanning the board and only the lines through the
+last move are checked for a win. Boards too big to search to the end are
+searched to a fixed depth with alpha-beta, scoring the leaves with a
+heuristic, and within an optional time budget.
+"""
+
+import math
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Directions a line can run in: across, down, and both diagonals
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Score of a won position, before preferring quicker wins
+WIN = 10 ** 9
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Position():
+    __slots__ = ("cells", "moves", "last", "winner")
+
+    def __init__(self, cells, moves=0, last=None, winner=None):
+        self.cells = cells
+        self.moves = moves
+        self.last = last
+        self.winner = winner
+
+
+class MNKGame():
+    def __init__(self, rows=3, columns=3, k=3):
+        if k > max(rows, columns):
+            raise ValueError("k must fit on the board")
+        self.rows = rows
+        self.columns = columns
+        self.k = k
+        self.size = rows * columns
+
+        # Every run of k cells on the board, for the heuristic
+        self.windows = []
+        for i in range(rows):
+            for j in range(columns):
+                for di, dj in DIRECTIONS:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < columns:
+                        self.windows.append(tuple(
+                            (i + di * step) * columns + (j + dj * step)
+                            for step in range(k)))
+
+        # Cells ordered from the center out, which are tried first
+        center_i, center_j = (rows - 1) / 2, (columns - 1) / 2
+        self.order = sorted(
+            range(self.size),
+            key=lambda cell: (abs(cell // columns - center_i)
+                              + abs(cell % columns - center_j)))
+
+        # Number of positions visited by searches, for benchmarking
+        self.nodes_searched = 0
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return Position((EMPTY,) * self.size)
+
+    def player(self, position):
+        """
+        Returns player who has the next turn on a board.
+        """
+        return X if position.moves % 2 == 0 else O
+
+    def actions(self, position):
+        """
+        Returns list of all possible actions (i, j) available on the board.
+        """
+        return [divmod(cell, self.columns) for cell in self.order
+                if position.cells[cell] is EMPTY]
+
+    def result(self, position, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        cell = i * self.columns + j
+        if not (0 <= i < self.rows and 0 <= j < self.columns):
+            raise ValueError("Move outside the board")
+        if position.cells[cell] is not EMPTY:
+            raise ValueError("Spot already occupied")
+
+        mark = self.player(position)
+        cells = list(position.cells)
+        cells[cell] = mark
+        winner = mark if self.completes_line(cells, i, j, mark) else None
+        return Position(tuple(cells), position.moves + 1, action, winner)
+
+    def completes_line(self, cells, i, j, mark):
+        """
+        Checks if the mark at (i, j) is part of k in a row.
+        """
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = i + sign * di, j + sign * dj
+                while (0 <= r < self.rows and 0 <= c < self.columns
+                       and cells[r * self.columns + c] == mark):
+                    count += 1
+                    r, c = r + sign * di, c + sign * dj
+            if count >= self.k:
+                return True
+        return False
+
+    def winner(self, position):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        return position.winner
+
+    def terminal(self, position):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return position.winner is not None or position.moves == self.size
+
+    def utility(self, position):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if position.winner == X:
+            return 1
+        if position.winner == O:
+            return -1
+        return 0
+
+    def evaluate(self, position):
+        """
+        Heuristic score of a position from X's point of view: each window
+        of k cells holding only one player's marks counts for that player,
+        more the fuller it is.
+        """
+        score = 0
+        cells = position.cells
+        for window in self.windows:
+            x_count = o_count = 0
+            for cell in window:
+                if cells[cell] == X:
+                    x_count += 1
+                elif cells[cell] == O:
+                    o_count += 1
+            if x_count and not o_count:
+                score += 10 ** x_count
+            elif o_count and not x_count:
+                score -= 10 ** o_count
+        return score
+
+    def to_board(self, position):
+        """
+        Returns the position as nested lists, like tictactoe.py boards.
+        """
+        return [list(position.cells[i * self.columns:(i + 1) * self.columns])
+                for i in range(self.rows)]
+
+    def from_board(self, board):
+        """
+        Returns the position for nested lists, like tictactoe.py boards.
+        """
+        cells = tuple(cell for row in board for cell in row)
+        if len(cells) != self.size:
+            raise ValueError("Board does not match the game size")
+        moves = sum(cell is not EMPTY for cell in cells)
+        position = Position(cells, moves)
+        for mark in (X, O):
+            for cell in range(self.size):
+                if cells[cell] == mark and self.completes_line(
+                        cells, cell // self.columns, cell % self.columns,
+                        mark):
+                    position.winner = mark
+        return position
+
+    def minimax(self, position, depth=None, seconds=None):
+        """
+        Returns the best action for the current player, searching depth
+        moves ahead (to the end of the game if None) with alpha-beta.
+
+        If seconds is given and runs out, returns the best action among
+        those fully searched so far.
+        """
+        if self.terminal(position):
+            return None
+        stop = None
+        if seconds is not None:
+            deadline = time.monotonic() + seconds
+            stop = lambda: time.monotonic() > deadline
+        depth = self.size if depth is None else depth
+        return self.search(position, depth, stop)[0]
+
+    def search(self, position, depth, stop=None, first=None):
+        """
+        Searches every action from a non-terminal position depth moves
+        ahead, trying first (if given) before the others.
+
+        Returns (best action, its value, whether every action was
+        searched). If stop() becomes true the search ends early with the
+        best of the actions searched so far.
+        """
+        maximizing = self.player(position) == X
+        alpha, beta = -math.inf, math.inf
+        moves = self.actions(position)
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        best_move = moves[0]
+        best = -math.inf if maximizing else math.inf
+        try:
+            for action in moves:
+                v = self.value(self.result(position, action), depth - 1,
+                               alpha, beta, stop)
+                if (v > best) if maximizing else (v < best):
+                    best, best_move = v, action
+                if maximizing:
+                    alpha = max(alpha, best)
+                else:
+                    beta = min(beta, best)
+        except SearchTimeout:
+            return best_move, best, False
+        return best_move, best, True
+
+    def value(self, position, depth, alpha, beta, stop=None):
+        """
+        Alpha-beta value of a position searched depth moves ahead, with
+        the heuristic at the leaves. Wins score higher the sooner they
+        come.
+
+        Raises SearchTimeout as soon as stop() is true.
+        """
+        self.nodes_searched += 1
+        if stop is not None and stop():
+            raise SearchTimeout
+        if position.winner is not None:
+            score = WIN - position.moves
+            return score if position.winner == X else -score
+        if position.moves == self.size:
+            return 0
+        if depth <= 0:
+            return self.evaluate(position)
+
+        if self.player(position) == X:
+            v = -math.inf
+            for action in self.actions(position):
+                v = max(v, self.value(self.result(position, action),
+                                      depth - 1, alpha, beta, stop))
+                if v >= beta:
+                    return v
+                alpha = max(alpha, v)
+        else:
+            v = math.inf
+            for action in self.actions(position):
+                v = min(v, self.value(self.result(position, action),
+                                      depth - 1, alpha, beta, stop))
+                if v <= alpha:
+                    return v
+                beta = min(beta, v)
+        return v
@@ -3,6 +3,8 @@ import sys
 import time
 
 import tictactoe as ttt
+from anytime import AnytimeSearch
+from mnk import MNKGame
 
 pygame.init()
 size = width, height = 600, 400
@@ -17,14 +19,34 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Without a book, load the solved positions, or solve and save them once
+if ttt.book is None and not ttt.load_table():
+    ttt.solve(ttt.initial_state())
+    ttt.save_table()
+
+# Seconds the AI may think for, searching in a background thread
+AI_SECONDS = 1.0
+game = MNKGame(3, 3, 3)
+
+
+def book(position):
+    board = game.to_board(position)
+    if ttt.book is not None:
+        return ttt.minimax(board)
+    return ttt.minimax_cached(board)
+
+
 user = None
 board = ttt.initial_state()
 ai_turn = False
+search = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if search is not None:
+                search.cancel()
             sys.exit()
 
     screen.fill(black)
@@ -108,13 +130,17 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, started in the background and applied once done
         if user != player and not game_over:
             if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
+                if search is None:
+                    search = AnytimeSearch(game, game.from_board(board),
+                                           AI_SECONDS, book=book)
+                    search.start()
+                elif search.done():
+                    board = ttt.result(board, list(search.best_move))
+                    search = None
+                    ai_turn = False
             else:
                 ai_turn = True
 
@@ -142,5 +168,8 @@ while True:
                     user = None
                     board = ttt.initial_state()
                     ai_turn = False
+                    if search is not None:
+                        search.cancel()
+                        search = None
 
     pygame.display.flip()
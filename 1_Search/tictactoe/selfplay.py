@@ -0,0 +1,186 @@
+"""
+Headless self-play between tic-tac-toe policies.
+
+Plays many games between two policies across a process pool, swapping
+sides every other game, and reports each policy's win/draw/loss rates,
+average decision time and positions searched per move.
+
+Usage: python selfplay.py POLICY POLICY [--games N] [--processes P]
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import tictactoe as ttt
+
+
+def minimax_policy(board, rng):
+    """Full minimax search, ignoring the book."""
+    saved, ttt.book = ttt.book, None
+    try:
+        return ttt.minimax(board)
+    finally:
+        ttt.book = saved
+
+
+def book_policy(board, rng):
+    """tictactoe.minimax, answering from the book when there is one."""
+    return ttt.minimax(board)
+
+
+def alphabeta_policy(board, rng):
+    """Alpha-beta search."""
+    return ttt.alphabeta(board)
+
+
+def cached_policy(board, rng):
+    """Symmetry-folded transposition table."""
+    return ttt.minimax_cached(board)
+
+
+def bitboard_policy(board, rng):
+    """Bitboard engine."""
+    return bitboard.minimax(board)
+
+
+def random_policy(board, rng):
+    """Uniformly random legal move."""
+    return rng.choice(ttt.actions(board))
+
+
+# Policy name -> (function of board and random generator, module whose
+# nodes_searched counts its positions)
+POLICIES = {
+    "minimax": (minimax_policy, ttt),
+    "book": (book_policy, ttt),
+    "alphabeta": (alphabeta_policy, ttt),
+    "cached": (cached_policy, ttt),
+    "bitboard": (bitboard_policy, bitboard),
+    "random": (random_policy, None),
+}
+
+
+class Record():
+    """
+    Results of one policy over a set of games.
+    """
+
+    def __init__(self):
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.moves = 0
+        self.seconds = 0.0
+        self.nodes = 0
+
+    def merge(self, other):
+        for field in vars(self):
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+
+def play(policies, rng, opening_moves=0):
+    """
+    Plays one game between {X: name, O: name} policies, the first
+    opening_moves moves being random.
+
+    Returns the winner and a {mark: (moves, seconds, nodes)} tally of
+    the moves each policy chose, leaving out the random openings.
+    """
+    board = ttt.initial_state()
+    tally = {ttt.X: [0, 0.0, 0], ttt.O: [0, 0.0, 0]}
+    played = 0
+    while not ttt.terminal(board):
+        mark = ttt.player(board)
+        if played < opening_moves:
+            move = rng.choice(ttt.actions(board))
+        else:
+            function, module = POLICIES[policies[mark]]
+            before = module.nodes_searched if module else 0
+            start = time.perf_counter()
+            move = function(board, rng)
+            tally[mark][0] += 1
+            tally[mark][1] += time.perf_counter() - start
+            tally[mark][2] += (module.nodes_searched if module else 0) - before
+        played += 1
+        board = ttt.result(board, move)
+    return ttt.winner(board), tally
+
+
+def play_games(first, second, games, seed, opening_moves):
+    """
+    Plays games between two policies, first playing X in even games.
+
+    Returns a Record for each.
+    """
+    rng = random.Random(seed)
+    records = (Record(), Record())
+    for game in range(games):
+        marks = (ttt.X, ttt.O) if game % 2 == 0 else (ttt.O, ttt.X)
+        winner, tally = play({marks[0]: first, marks[1]: second}, rng,
+                             opening_moves)
+        for record, mark in zip(records, marks):
+            if winner is None:
+                record.draws += 1
+            elif winner == mark:
+                record.wins += 1
+            else:
+                record.losses += 1
+            moves, seconds, nodes = tally[mark]
+            record.moves += moves
+            record.seconds += seconds
+            record.nodes += nodes
+    return records
+
+
+def self_play(first, second, games, processes=None, seed=0, opening_moves=0,
+              chunk=100):
+    """
+    Plays games between two policies across a process pool.
+
+    Returns a Record for each policy.
+    """
+    totals = (Record(), Record())
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = []
+        for start in range(0, games, chunk):
+            futures.append(pool.submit(play_games, first, second,
+                                       min(chunk, games - start),
+                                       seed + start, opening_moves))
+        for future in futures:
+            for total, record in zip(totals, future.result()):
+                total.merge(record)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Self-play between "
+                                     "tic-tac-toe policies.")
+    parser.add_argument("first", choices=POLICIES)
+    parser.add_argument("second", choices=POLICIES)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--opening-moves", type=int, default=0,
+                        help="random moves at the start of every game")
+    args = parser.parse_args()
+
+    records = self_play(args.first, args.second, args.games, args.processes,
+                        args.seed, args.opening_moves)
+    for name, record in zip((args.first, args.second), records):
+        games, moves = record.games(), max(record.moves, 1)
+        print(f"{name}: "
+              f"win {record.wins / games:.1%}  "
+              f"draw {record.draws / games:.1%}  "
+              f"loss {record.losses / games:.1%}  "
+              f"{1000 * record.seconds / moves:.3f} ms/move  "
+              f"{record.nodes / moves:.1f} positions/move")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,53 @@
 Tic Tac Toe Player
 """
 
+import json
 import math
-import copy
+import os
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Order alpha-beta tries moves in: center, then corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Number of positions visited by searches, for benchmarking
+nodes_searched = 0
+
+# The 8 rotations and reflections of the board, as cell mappings
+SYMMETRIES = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+# Maps canonical board keys to their game-theoretic value
+table = {}
+
+# Where save_table and load_table keep the solved table by default
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "table.json")
+
+# Format of saved tables, to be raised whenever the values solve computes
+# change, so older tables are ignored. Tables saved before versioning
+# (from before the fix to winner) have none.
+TABLE_VERSION = 2
+
+# Solved-game book written by book.py: one byte per board index, holding
+# the cell 3 * i + j of the optimal move, or NO_MOVE
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 255
+book = None
+
 
 def initial_state():
     """
@@ -54,7 +94,7 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    result_board = copy.deepcopy(board)
+    result_board = [row[:] for row in board]
     try:
         if result_board[action[0]][action[1]] is not EMPTY:
             raise IndexError
@@ -75,17 +115,20 @@ def winner(board):
 
     # I'm providing an easy to understand method, but there are more efficient ways to check
 
-    # First we check in rows (in case the 3 are EMPTY, returns EMPTY, which is None)
+    # First we check in rows (3 EMPTY cells in a line are not a win, so we keep looking)
     for row in range(0,3):
-        if board[row][0] == board[row][1] and board[row][1] == board[row][2]:
+        if board[row][0] == board[row][1] and board[row][1] == board[row][2] and board[row][1] is not EMPTY:
             return board[row][1]
 
-    # Then we check in columns (in case the 3 are EMPTY, returns EMPTY, which is None)
+    # Then we check in columns
     for column in range(0,3):
-        if board[0][column] == board[1][column] and board[1][column] == board[2][column]:
+        if board[0][column] == board[1][column] and board[1][column] == board[2][column] and board[1][column] is not EMPTY:
             return board[1][column]
     
     # Finally we check both diagonals
+    if board[1][1] is EMPTY:
+        return None
+
     if board[0][0] == board[1][1] and board[1][1] == board[2][2]:
         return board[1][1]
     
@@ -115,6 +158,12 @@ def utility(board):
     return 1 if winner(board) == X else -1
 
 def minimax(board):
+    # Answer from the book when there is one
+    if book is not None:
+        move = book[board_index(board)]
+        if move != NO_MOVE:
+            return [move // 3, move % 3]
+
     current_player = player(board)
 
     if current_player == X:
@@ -134,6 +183,8 @@ def minimax(board):
     return best_move
 
 def max_value(board):
+    global nodes_searched
+    nodes_searched += 1
     if terminal(board):
         return utility(board)
     v = -math.inf
@@ -142,9 +193,179 @@ def max_value(board):
     return v    #FIXED
 
 def min_value(board):
+    global nodes_searched
+    nodes_searched += 1
     if terminal(board):
         return utility(board)
     v = math.inf
     for action in actions(board):
         v = min(v, max_value(result(board, action)))
     return v    #FIXED
+
+
+def ordered_actions(board):
+    """
+    Returns the available actions, center first, then corners, then edges.
+    """
+    return [[row, column] for row, column in MOVE_ORDER
+            if board[row][column] is EMPTY]
+
+
+def alphabeta(board):
+    """
+    Returns the optimal action for the current player, like minimax,
+    but skipping branches that cannot change the result.
+    """
+    if terminal(board):
+        return None
+
+    alpha, beta = -math.inf, math.inf
+    best_move = None
+    if player(board) == X:
+        v = -math.inf
+        for action in ordered_actions(board):
+            k = min_value_ab(result(board, action), alpha, beta)
+            if k > v:
+                v = k
+                best_move = action
+            alpha = max(alpha, v)
+    else:
+        v = math.inf
+        for action in ordered_actions(board):
+            k = max_value_ab(result(board, action), alpha, beta)
+            if k < v:
+                v = k
+                best_move = action
+            beta = min(beta, v)
+    return best_move
+
+def max_value_ab(board, alpha, beta):
+    global nodes_searched
+    nodes_searched += 1
+    if terminal(board):
+        return utility(board)
+    v = -math.inf
+    for action in ordered_actions(board):
+        v = max(v, min_value_ab(result(board, action), alpha, beta))
+        if v >= beta:
+            return v
+        alpha = max(alpha, v)
+    return v
+
+def min_value_ab(board, alpha, beta):
+    global nodes_searched
+    nodes_searched += 1
+    if terminal(board):
+        return utility(board)
+    v = math.inf
+    for action in ordered_actions(board):
+        v = min(v, max_value_ab(result(board, action), alpha, beta))
+        if v <= alpha:
+            return v
+        beta = min(beta, v)
+    return v
+
+
+def canonical(board):
+    """
+    Returns a key shared by a board and all of its rotations and
+    reflections.
+    """
+    return min(
+        "".join(board[i][j] or "-"
+                for i, j in (symmetry(row, column)
+                             for row in range(3) for column in range(3)))
+        for symmetry in SYMMETRIES
+    )
+
+
+def solve(board):
+    """
+    Returns the game-theoretic value of a board (1, 0 or -1), solving
+    each position up to symmetry only once per process.
+    """
+    global nodes_searched
+    key = canonical(board)
+    if key in table:
+        return table[key]
+    nodes_searched += 1
+
+    if terminal(board):
+        v = utility(board)
+    elif player(board) == X:
+        v = max(solve(result(board, action)) for action in actions(board))
+    else:
+        v = min(solve(result(board, action)) for action in actions(board))
+    table[key] = v
+    return v
+
+
+def minimax_cached(board):
+    """
+    Returns the optimal action for the current player, like minimax,
+    using the transposition table.
+    """
+    if terminal(board):
+        return None
+    choose = max if player(board) == X else min
+    return choose(actions(board),
+                  key=lambda action: solve(result(board, action)))
+
+
+def save_table(path=TABLE_FILE):
+    """
+    Writes the transposition table to a JSON file, stamped with
+    TABLE_VERSION.
+    """
+    with open(path, "w") as f:
+        json.dump({"version": TABLE_VERSION, "table": table}, f)
+
+
+def load_table(path=TABLE_FILE):
+    """
+    Loads a transposition table saved by save_table.
+
+    Returns False if there is no saved table, or if it was saved in
+    another version and is ignored.
+    """
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return False
+    if not isinstance(saved, dict) or saved.get("version") != TABLE_VERSION:
+        return False
+    table.update(saved["table"])
+    return True
+
+
+def board_index(board):
+    """
+    Returns the board read as a base 3 number (EMPTY 0, X 1, O 2).
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = 3 * index + (0 if cell is EMPTY else 1 if cell == X else 2)
+    return index
+
+
+def load_book(path=BOOK_FILE):
+    """
+    Loads the book written by book.py, for minimax to answer from.
+
+    Returns False if there is no book.
+    """
+    global book
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return False
+    if len(data) != BOOK_SIZE:
+        raise ValueError(f"{path} is not a tic-tac-toe book")
+    book = data
+    return True
+
+
+load_book()
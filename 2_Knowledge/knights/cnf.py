@@ -0,0 +1,222 @@
+"""
+Compiles logical sentences to clause form (CNF).
+
+Symbols are numbered 1, 2, ... by a SymbolTable, and a clause is a tuple
+of nonzero integers: v for a symbol and -v for its negation, as in DIMACS.
+For evaluation each clause is further packed into a pair of bit masks, so
+a model is a single integer with bit v - 1 set when symbol v is true.
+
+Compiling distributes Or over And, so the clauses can grow exponentially
+with the sentence: a chain of biconditionals over n symbols has 2^(n-1)
+clauses. model_check still enumerates all 2^n models, each against
+every clause, so it is a constant factor faster than logic.model_check
+rather than a better algorithm. sat.entails scales to large puzzles.
+"""
+
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+
+class SymbolTable():
+    """
+    Numbers symbol names 1, 2, ... in order of first use.
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self.index = {}
+        for name in names:
+            self.variable(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def variable(self, name):
+        """Returns the number of a symbol name, adding it if new."""
+        if name not in self.index:
+            self.names.append(name)
+            self.index[name] = len(self.names)
+        return self.index[name]
+
+    def fresh(self):
+        """Returns the number of a new auxiliary variable, with no name."""
+        self.names.append(None)
+        return len(self.names)
+
+    def name(self, literal):
+        """Returns the symbol name of a literal (None if auxiliary)."""
+        return self.names[abs(literal) - 1]
+
+
+class CNF():
+    """
+    A sentence compiled to clauses over a SymbolTable.
+    """
+
+    def __init__(self, clauses, table):
+        self.clauses = clauses
+        self.table = table
+
+        # (positive, negative) bit masks of each clause
+        self.masks = []
+        for clause in clauses:
+            positive = negative = 0
+            for literal in clause:
+                if literal > 0:
+                    positive |= 1 << (literal - 1)
+                else:
+                    negative |= 1 << (-literal - 1)
+            self.masks.append((positive, negative))
+
+    def evaluate_bits(self, model):
+        """
+        Evaluates the clauses in a model given as an integer, with bit
+        v - 1 set when symbol v is true.
+        """
+        for positive, negative in self.masks:
+            if not (model & positive or ~model & negative):
+                return False
+        return True
+
+    def evaluate(self, model):
+        """
+        Evaluates the clauses in a model given as a dictionary of symbol
+        names to truth values, like Sentence.evaluate.
+        """
+        return self.evaluate_bits(self.bits(model))
+
+    def bits(self, model):
+        """Returns the integer form of a dictionary model."""
+        bits = 0
+        for name, value in model.items():
+            if value and name in self.table.index:
+                bits |= 1 << (self.table.index[name] - 1)
+        return bits
+
+
+def clauses(sentence, table, negate=False):
+    """
+    Returns the CNF clauses of a sentence (or of its negation) as a list
+    of tuples of literals, numbering its symbols in table.
+
+    Tautological clauses are dropped, so a valid sentence has no clauses
+    and an unsatisfiable one may contain the empty clause.
+
+    Or is distributed over And, so the number of clauses can be
+    exponential in the size of the sentence, as for nested biconditionals.
+    sat.Encoder gives linearly many clauses with auxiliary variables.
+    """
+    if isinstance(sentence, Symbol):
+        v = table.variable(sentence.name)
+        return [(-v,) if negate else (v,)]
+    if isinstance(sentence, Not):
+        return clauses(sentence.operand, table, not negate)
+    if isinstance(sentence, And):
+        parts = [clauses(conjunct, table, negate)
+                 for conjunct in sentence.conjuncts]
+        return distribute(parts) if negate else conjoin(parts)
+    if isinstance(sentence, Or):
+        parts = [clauses(disjunct, table, negate)
+                 for disjunct in sentence.disjuncts]
+        return conjoin(parts) if negate else distribute(parts)
+    if isinstance(sentence, Implication):
+        if negate:
+            # ¬(a => b) is a ∧ ¬b
+            return conjoin([clauses(sentence.antecedent, table),
+                            clauses(sentence.consequent, table, True)])
+        return distribute([clauses(sentence.antecedent, table, True),
+                           clauses(sentence.consequent, table)])
+    if isinstance(sentence, Biconditional):
+        left, right = sentence.left, sentence.right
+        if negate:
+            # ¬(a <=> b) is (a ∨ b) ∧ (¬a ∨ ¬b)
+            return conjoin([
+                distribute([clauses(left, table), clauses(right, table)]),
+                distribute([clauses(left, table, True),
+                            clauses(right, table, True)]),
+            ])
+        # a <=> b is (¬a ∨ b) ∧ (a ∨ ¬b)
+        return conjoin([
+            distribute([clauses(left, table, True), clauses(right, table)]),
+            distribute([clauses(left, table), clauses(right, table, True)]),
+        ])
+    Sentence.validate(sentence)
+    raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+
+def conjoin(parts):
+    """
+    Returns the clauses of the conjunction of several clause lists.
+    """
+    seen = set()
+    result = []
+    for part in parts:
+        for clause in part:
+            if clause not in seen:
+                seen.add(clause)
+                result.append(clause)
+    return result
+
+
+def distribute(parts):
+    """
+    Returns the clauses of the disjunction of several clause lists, by
+    distributing the disjunction over their conjunctions.
+    """
+    result = [()]
+    for part in parts:
+        combined = []
+        seen = set()
+        for left in result:
+            for right in part:
+                clause = merge(left, right)
+                if clause is not None and clause not in seen:
+                    seen.add(clause)
+                    combined.append(clause)
+        result = combined
+    return result
+
+
+def merge(left, right):
+    """
+    Returns the clause holding the literals of both clauses, sorted and
+    without repeats, or None if it is a tautology.
+    """
+    literals = set(left)
+    literals.update(right)
+    for literal in literals:
+        if -literal in literals:
+            return None
+    return tuple(sorted(literals, key=abs))
+
+
+def compile_sentence(sentence, table=None):
+    """
+    Compiles a sentence to a CNF, numbering its symbols in table (a new
+    SymbolTable if not given).
+
+    The CNF is equivalent to the sentence, without auxiliary variables, so
+    it can be evaluated in any model, but it can have exponentially many
+    clauses (see clauses).
+    """
+    if table is None:
+        table = SymbolTable()
+    return CNF(clauses(sentence, table), table)
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, like logic.model_check, but
+    enumerates models as integers against the compiled clauses.
+
+    This is still 2^n models, so it only saves the cost of walking the
+    sentences; use sat.entails for puzzles with many symbols.
+    """
+    table = SymbolTable(sorted(set.union(knowledge.symbols(),
+                                         query.symbols())))
+    knowledge = compile_sentence(knowledge, table)
+    query = compile_sentence(query, table)
+
+    for model in range(2 ** len(table)):
+        if knowledge.evaluate_bits(model) and not query.evaluate_bits(model):
+            return False
+    return True
@@ -0,0 +1,265 @@
+"""
+Reading and writing logical sentences as text.
+
+parse reads the syntax of Sentence.formula() back into sentences, and
+read_dimacs and write_dimacs stream clauses in the DIMACS CNF format used
+by SAT solvers. Neither recurses, so inputs with hundreds of thousands of
+clauses don't hit the recursion limit: parse uses operator precedence
+with explicit stacks and builds one flat And or Or for each chain of the
+same connective, and a DIMACS file becomes a flat And of Or clauses.
+"""
+
+import re
+
+from cnf import SymbolTable, clauses as cnf_clauses
+from logic import Symbol, Not, And, Or, Implication, Biconditional
+from sat import Encoder
+
+# Connective -> (precedence, ASCII spellings). ¬ binds tightest.
+CONNECTIVES = {
+    "¬": (5, ("~", "!")),
+    "∧": (4, ("&",)),
+    "∨": (3, ("|",)),
+    "=>": (2, ("->",)),
+    "<=>": (1, ("<->",)),
+}
+SPELLINGS = {spelling: connective
+             for connective, (_, spellings) in CONNECTIVES.items()
+             for spelling in (connective, *spellings)}
+
+# Constant -> the empty sentence Sentence.formula() writes it for
+CONSTANTS = {
+    "⊤": And,
+    "⊥": Or,
+}
+TOKENS = re.compile("(" + "|".join(
+    re.escape(token)
+    for token in sorted([*SPELLINGS, *CONSTANTS, "(", ")"], key=len,
+                        reverse=True)
+) + ")")
+
+
+def tokenize(text):
+    """
+    Yields the connectives, constants, parentheses and symbol names of a
+    formula. A name is any text between them, without surrounding
+    whitespace, and each name is one Symbol however often it appears.
+    """
+    symbols = dict()
+    for i, token in enumerate(TOKENS.split(text)):
+        if i % 2:
+            yield SPELLINGS.get(token, token)
+        else:
+            token = token.strip()
+            if token:
+                if token not in symbols:
+                    symbols[token] = Symbol(token)
+                yield symbols[token]
+
+
+def parse(text):
+    """
+    Returns the sentence written as text in the syntax of
+    Sentence.formula(), where ~ or !, &, |, -> and <-> may stand for
+    ¬, ∧, ∨, => and <=>.
+
+    Without parentheses ¬ binds tightest, then ∧, ∨, => and <=>, and =>
+    groups to the right. A chain of ∧ or ∨ becomes a single And or Or,
+    and ⊤ and ⊥ are the empty And and Or.
+    """
+    # Operands, each with whether it is an unparenthesized chain that a
+    # following connective of the same kind may extend
+    operands = []
+    operators = []
+    expect_operand = True
+
+    def reduce():
+        operator = operators.pop()
+        if operator == "¬":
+            operand, _ = operands.pop()
+            operands.append((Not(operand), False))
+            return
+        right, _ = operands.pop()
+        left, chain = operands.pop()
+        if operator == "∧":
+            if chain and isinstance(left, And):
+                left.conjuncts.append(right)
+                operands.append((left, True))
+            else:
+                operands.append((And(left, right), True))
+        elif operator == "∨":
+            if chain and isinstance(left, Or):
+                left.disjuncts.append(right)
+                operands.append((left, True))
+            else:
+                operands.append((Or(left, right), True))
+        elif operator == "=>":
+            operands.append((Implication(left, right), False))
+        else:
+            operands.append((Biconditional(left, right), False))
+
+    for token in tokenize(text):
+        if isinstance(token, Symbol) or token in CONSTANTS:
+            if not expect_operand:
+                raise ValueError(f"expected a connective before {token}")
+            if not isinstance(token, Symbol):
+                token = CONSTANTS[token]()
+            operands.append((token, False))
+            expect_operand = False
+        elif token == "(" or token == "¬":
+            if not expect_operand:
+                raise ValueError(f"expected a connective before {token}")
+            operators.append(token)
+        elif token == ")":
+            if expect_operand:
+                raise ValueError("expected a sentence before )")
+            while operators and operators[-1] != "(":
+                reduce()
+            if not operators:
+                raise ValueError("unbalanced )")
+            operators.pop()
+            operands[-1] = (operands[-1][0], False)
+        else:
+            if expect_operand:
+                raise ValueError(f"expected a sentence before {token}")
+            precedence = CONNECTIVES[token][0]
+
+            # => groups to the right; the others to the left
+            while operators and operators[-1] != "(":
+                top = CONNECTIVES[operators[-1]][0]
+                if top < precedence or (top == precedence and token == "=>"):
+                    break
+                reduce()
+            operators.append(token)
+            expect_operand = True
+
+    if expect_operand:
+        raise ValueError("expected a sentence at the end")
+    while operators:
+        if operators[-1] == "(":
+            raise ValueError("unbalanced (")
+        reduce()
+    return operands[0][0]
+
+
+def read_dimacs(lines, names=None):
+    """
+    Yields the clauses of a DIMACS CNF file, given as an iterable of
+    lines, as tuples of nonzero integers.
+
+    If names is a dictionary, the "c var" comments written by
+    write_dimacs fill it with variable -> symbol name.
+
+    A line starting with % ends the file, as in the SATLIB benchmarks,
+    which follow it with a stray 0 that is not an empty clause.
+    """
+    clause = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("%"):
+            break
+        if not line or line[0] == "p":
+            continue
+        if line[0] == "c":
+            fields = line.split(None, 3)
+            if names is not None and len(fields) == 4 and fields[1] == "var":
+                names[int(fields[2])] = fields[3]
+            continue
+        for field in line.split():
+            literal = int(field)
+            if literal == 0:
+                yield tuple(clause)
+                clause = []
+            else:
+                clause.append(literal)
+    if clause:
+        yield tuple(clause)
+
+
+def load_dimacs(lines):
+    """
+    Returns the sentence of a DIMACS CNF file, given as an iterable of
+    lines: an And of one Or per clause. Variables without a "c var"
+    comment are named x1, x2, ..., with primes added to avoid the names
+    that are given.
+
+    A file without clauses is the empty And, which is true, and an empty
+    clause is the empty Or, which is false.
+    """
+    names = dict()
+    clauses = list(read_dimacs(lines, names))
+
+    # Default names must not clash with the names read from comments,
+    # which can come anywhere in the file
+    taken = set(names.values())
+    symbols = dict()
+    for v, name in names.items():
+        symbols[v] = Symbol(name)
+
+    conjuncts = []
+    for clause in clauses:
+        disjuncts = []
+        for literal in clause:
+            v = abs(literal)
+            if v not in symbols:
+                name = f"x{v}"
+                while name in taken:
+                    name += "'"
+                symbols[v] = Symbol(name)
+            disjuncts.append(symbols[v] if literal > 0 else Not(symbols[v]))
+        conjuncts.append(Or(*disjuncts))
+    return And(*conjuncts)
+
+
+def write_dimacs(f, clauses, table=None):
+    """
+    Writes a list of clauses of nonzero integers to a text file in
+    DIMACS CNF format. If table (a cnf.SymbolTable) is given, the symbol
+    names are written as "c var" comments.
+    """
+    variables = max((abs(literal) for clause in clauses for literal in clause),
+                    default=0)
+    if table is not None:
+        variables = max(variables, len(table))
+        for v, name in enumerate(table.names, 1):
+            if name is not None:
+                f.write(f"c var {v} {name}\n")
+    f.write(f"p cnf {variables} {len(clauses)}\n")
+    for clause in clauses:
+        f.write(" ".join(map(str, clause)) + " 0\n")
+
+
+class ClauseList():
+    """
+    Stands in for a sat.Solver to collect the clauses a sat.Encoder adds,
+    as they are, without simplifying them.
+    """
+
+    def __init__(self):
+        self.clauses = []
+
+    def reserve(self, count):
+        pass
+
+    def add_clause(self, literals):
+        self.clauses.append(tuple(literals))
+        return True
+
+
+def dump_dimacs(f, sentence, exact=False):
+    """
+    Writes a sentence to a text file in DIMACS CNF format.
+
+    By default the clauses are the Tseitin encoding of sat.Encoder, which
+    grows linearly with the sentence but adds unnamed auxiliary variables,
+    so it is satisfiable exactly when the sentence is rather than being
+    equivalent to it. With exact=True they are the conjunctive normal form
+    of cnf.clauses, which is equivalent but can grow exponentially.
+    """
+    if exact:
+        table = SymbolTable()
+        write_dimacs(f, cnf_clauses(sentence, table), table)
+        return
+    encoder = Encoder(ClauseList())
+    encoder.add(sentence)
+    write_dimacs(f, encoder.solver.clauses, encoder.table)
@@ -2,11 +2,20 @@ import itertools
 
 
 class Sentence():
+    __slots__ = ()
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned: returns True or False if every completion of the
+        model agrees, otherwise None.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -43,6 +52,7 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
         self.name = name
@@ -62,6 +72,9 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        return model.get(self.name)
+
     def formula(self):
         return self.name
 
@@ -70,6 +83,8 @@ class Symbol(Sentence):
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
@@ -86,6 +101,10 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
@@ -94,13 +113,16 @@ class Not(Sentence):
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return (isinstance(other, And)
+                and tuple(self.conjuncts) == tuple(other.conjuncts))
 
     def __hash__(self):
         return hash(
@@ -120,24 +142,40 @@ class And(Sentence):
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
+        if not self.conjuncts:
+            return "⊤"
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return (isinstance(other, Or)
+                and tuple(self.disjuncts) == tuple(other.disjuncts))
 
     def __hash__(self):
         return hash(
@@ -151,17 +189,32 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
+        if not self.disjuncts:
+            return "⊥"
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
@@ -183,6 +236,17 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
@@ -193,6 +257,8 @@ class Implication(Sentence):
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
@@ -216,17 +282,184 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+class Interned():
+    """
+    Mixin for sentences built by an Interner, which are immutable and
+    cache their hash and symbols.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("interned sentences are immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Sentence) or hash(other) != self._hash:
+            return False
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return self._hash
+
+    def symbols(self):
+        return set(self._symbols)
+
+
+class InternedSymbol(Interned, Symbol):
+    __slots__ = ("_hash", "_symbols")
+
+
+class InternedNot(Interned, Not):
+    __slots__ = ("_hash", "_symbols")
+
+
+class InternedAnd(Interned, And):
+    __slots__ = ("_hash", "_symbols")
+
+    def add(self, conjunct):
+        raise AttributeError("interned sentences are immutable")
+
+
+class InternedOr(Interned, Or):
+    __slots__ = ("_hash", "_symbols")
+
+
+class InternedImplication(Interned, Implication):
+    __slots__ = ("_hash", "_symbols")
+
+
+class InternedBiconditional(Interned, Biconditional):
+    __slots__ = ("_hash", "_symbols")
+
+
+class Interner():
+    """
+    Builds sentences in which structurally identical subsentences are a
+    single shared node, so large generated knowledge bases form a DAG.
+
+    Nodes compare and hash equal to the ordinary sentences they stand
+    for, and can be mixed with them.
+    """
+
+    def __init__(self):
+        self.nodes = dict()
+        self.ids = set()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def intern(self, sentence):
+        """Returns the shared node equal to a sentence."""
+        if id(sentence) in self.ids:
+            return sentence
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return self.negation(sentence.operand)
+        if isinstance(sentence, And):
+            return self.conjunction(*sentence.conjuncts)
+        if isinstance(sentence, Or):
+            return self.disjunction(*sentence.disjuncts)
+        if isinstance(sentence, Implication):
+            return self.implication(sentence.antecedent, sentence.consequent)
+        if isinstance(sentence, Biconditional):
+            return self.biconditional(sentence.left, sentence.right)
+        Sentence.validate(sentence)
+        raise TypeError(f"cannot intern {type(sentence).__name__}")
+
+    def symbol(self, name):
+        node = self.nodes.get(("symbol", name))
+        if node is None:
+            node = self.create(InternedSymbol, ("symbol", name), (),
+                               hash(("symbol", name)), name=name)
+        return node
+
+    def negation(self, operand):
+        operand = self.intern(operand)
+        return self.compound(InternedNot, "not", (operand,),
+                             ("not", operand._hash), operand=operand)
+
+    def conjunction(self, *conjuncts):
+        conjuncts = tuple(self.intern(conjunct) for conjunct in conjuncts)
+        hashes = tuple(conjunct._hash for conjunct in conjuncts)
+        return self.compound(InternedAnd, "and", conjuncts,
+                             ("and", hashes), conjuncts=conjuncts)
+
+    def disjunction(self, *disjuncts):
+        disjuncts = tuple(self.intern(disjunct) for disjunct in disjuncts)
+        hashes = tuple(disjunct._hash for disjunct in disjuncts)
+        return self.compound(InternedOr, "or", disjuncts,
+                             ("or", hashes), disjuncts=disjuncts)
+
+    def implication(self, antecedent, consequent):
+        antecedent = self.intern(antecedent)
+        consequent = self.intern(consequent)
+        return self.compound(
+            InternedImplication, "implies", (antecedent, consequent),
+            ("implies", antecedent._hash, consequent._hash),
+            antecedent=antecedent, consequent=consequent)
+
+    def biconditional(self, left, right):
+        left = self.intern(left)
+        right = self.intern(right)
+        return self.compound(
+            InternedBiconditional, "biconditional", (left, right),
+            ("biconditional", left._hash, right._hash),
+            left=left, right=right)
+
+    def compound(self, cls, tag, children, hashed, **fields):
+        """Returns the shared node with the given interned children."""
+        key = (tag, *[id(child) for child in children])
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.create(cls, key, children, hash(hashed), **fields)
+        return node
+
+    def create(self, cls, key, children, hashed, **fields):
+        node = object.__new__(cls)
+        for name, value in fields.items():
+            object.__setattr__(node, name, value)
+        if cls is InternedSymbol:
+            symbols = frozenset([node.name])
+        else:
+            symbols = frozenset().union(
+                *[child._symbols for child in children])
+        object.__setattr__(node, "_hash", hashed)
+        object.__setattr__(node, "_symbols", symbols)
+        self.nodes[key] = node
+        self.ids.add(id(node))
+        return node
+
+
+def model_check(knowledge, query, partial=False):
+    """
+    Checks if knowledge base entails query.
+
+    With partial=True, symbols are assigned one at a time in a single
+    shared model, and a branch is abandoned as soon as the knowledge base
+    is false or the query is true in every completion of it.
+    """
+    if partial:
+        return check_partial(knowledge, query)
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +494,91 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def check_partial(knowledge, query):
+    """Checks if knowledge base entails query, pruning partial models."""
+    symbols = list(set.union(knowledge.symbols(), query.symbols()))
+    model = dict()
+
+    def check_all(index):
+        """Checks if knowledge base entails query in every completion."""
+
+        # If knowledge base is false however the rest is assigned, then
+        # nothing below here can contradict entailment
+        if knowledge.evaluate_partial(model) is False:
+            return True
+
+        # Likewise if the query is already true
+        value = query.evaluate_partial(model)
+        if value is True:
+            return True
+        if value is False and knowledge.evaluate_partial(model) is True:
+            return False
+
+        # Assign the next symbol in place, trying both values
+        p = symbols[index]
+        model[p] = True
+        entailed = check_all(index + 1)
+        if entailed:
+            model[p] = False
+            entailed = check_all(index + 1)
+        del model[p]
+        return entailed
+
+    return check_all(0)
+
+
+def entailed_literals(knowledge, symbols=None):
+    """
+    Returns every literal (a symbol or its negation) over symbols that
+    knowledge base entails, in a single enumeration of the models.
+
+    symbols defaults to the symbols of the knowledge base, sorted by name.
+    If the knowledge base is unsatisfiable, it entails every literal.
+    """
+    if symbols is None:
+        symbols = [Symbol(name) for name in sorted(knowledge.symbols())]
+    names = list(knowledge.symbols())
+    model = dict()
+
+    # Symbol name -> the value it has in every model found so far
+    candidates = None
+
+    def check_all(index):
+        """Narrows the candidates by every model extending this one."""
+        nonlocal candidates
+        if candidates == {}:
+            return
+        value = knowledge.evaluate_partial(model)
+        if value is False:
+            return
+        if index == len(names):
+            if candidates is None:
+                candidates = {
+                    symbol.name: model.get(symbol.name) for symbol in symbols
+                }
+            else:
+                candidates = {
+                    name: value for name, value in candidates.items()
+                    if model.get(name) == value
+                }
+            return
+
+        # Assign the next symbol in place, trying both values
+        p = names[index]
+        model[p] = True
+        check_all(index + 1)
+        model[p] = False
+        check_all(index + 1)
+        del model[p]
+
+    check_all(0)
+
+    literals = []
+    for symbol in symbols:
+        if candidates is None or candidates.get(symbol.name) is True:
+            literals.append(symbol)
+        if candidates is None or candidates.get(symbol.name) is False:
+            literals.append(Not(symbol))
+    return literals
@@ -0,0 +1,565 @@
+"""
+SAT-based entailment for logical sentences.
+
+A knowledge base entails a query when KB ∧ ¬query is unsatisfiable, which
+a SAT solver can usually decide without enumerating every model. Sentences
+are turned into clauses by Tseitin encoding, which adds one auxiliary
+variable per connective instead of distributing Or over And, and the
+clauses are solved by conflict-driven clause learning (CDCL): unit
+propagation over two watched literals, pure-literal decisions, first-UIP
+clause learning with non-chronological backtracking, activity-based
+branching and restarts.
+
+KnowledgeBase keeps one solver for a growing set of sentences and asks
+each query under an assumption, so work is shared between queries.
+"""
+
+import heapq
+
+from cnf import SymbolTable
+from logic import Symbol, Not, And, Or, Implication, Biconditional
+
+
+class Solver():
+    """
+    CDCL solver over DIMACS-style clauses: variables are 1, 2, ... and a
+    literal is v or -v.
+    """
+
+    def __init__(self):
+        # Per-variable state, indexed by variable (0 unused)
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.phases = [False]
+        self.activity = [0.0]
+
+        self.clauses = []
+        self.learnt = []
+        self.watches = {}
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.trail_limits = []
+        self.queue_head = 0
+
+        self.heap = []
+        self.increment = 1.0
+
+        # False once the clauses are known to be unsatisfiable
+        self.ok = True
+        self.model = None
+
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def reserve(self, count):
+        """Makes room for variables up to count."""
+        while len(self.values) <= count:
+            v = len(self.values)
+            self.values.append(None)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.phases.append(False)
+            self.activity.append(0.0)
+            self.watches[v] = []
+            self.watches[-v] = []
+            heapq.heappush(self.heap, (0.0, v))
+
+    def value(self, literal):
+        """Returns the truth value of a literal, or None if unassigned."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause. Returns False if the clauses have become
+        unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        clause = []
+        for literal in literals:
+            if literal == 0:
+                raise ValueError("0 is not a literal")
+            self.reserve(abs(literal))
+            value = self.value(literal)
+            if value is True or -literal in clause:
+                return True
+            if value is None and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses.append(clause)
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def enqueue(self, literal, reason):
+        v = abs(literal)
+        self.values[v] = literal > 0
+        self.levels[v] = len(self.trail_limits)
+        self.reasons[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Propagates the assignments queued on the trail. Returns a
+        conflicting clause, or None.
+        """
+        values = self.values
+        while self.queue_head < len(self.trail):
+            false = -self.trail[self.queue_head]
+            self.queue_head += 1
+            self.propagations += 1
+
+            watching = self.watches[false]
+            kept = []
+            for position, clause in enumerate(watching):
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                value = values[abs(first)]
+                if value is not None and value == (first > 0):
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    value = values[abs(literal)]
+                    if value is None or value == (literal > 0):
+                        clause[1], clause[k] = literal, false
+                        self.watches[literal].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if values[abs(first)] is not None:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false] = kept
+                        return clause
+                    self.enqueue(first, clause)
+            self.watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learnt from a conflict, with its
+        asserting literal first, and the level to backtrack to.
+        """
+        level = len(self.trail_limits)
+        seen = set()
+        learnt = [None]
+        counter = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                v = abs(other)
+                if other == literal or v in seen or self.levels[v] == 0:
+                    continue
+                seen.add(v)
+                self.bump(v)
+                if self.levels[v] == level:
+                    counter += 1
+                else:
+                    learnt.append(other)
+
+            # Resolve on the latest assignment of this level in the clause
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal assigned last after the asserting one
+        second = max(range(1, len(learnt)),
+                     key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[second] = learnt[second], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            for u in range(1, len(self.activity)):
+                self.activity[u] *= 1e-100
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[u], u)
+                         for u in range(1, len(self.values))
+                         if self.values[u] is None]
+            heapq.heapify(self.heap)
+        elif self.values[v] is None:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def backtrack(self, level):
+        """Undoes every assignment above a decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            v = abs(literal)
+            self.phases[v] = literal > 0
+            self.values[v] = None
+            self.reasons[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.queue_head = start
+
+    def pure_literals(self, assumptions):
+        """
+        Returns the literals whose negation appears in no clause or
+        assumption. Making them true cannot falsify anything.
+        """
+        present = set(assumptions)
+        for clause in self.clauses:
+            present.update(clause)
+        return [literal for literal in present
+                if -literal not in present and self.value(literal) is None]
+
+    def decide(self, pure):
+        """
+        Returns the next decision literal, pure literals first, or None
+        if every variable is assigned.
+        """
+        while pure:
+            literal = pure.pop()
+            if self.value(literal) is None:
+                return literal
+        while self.heap:
+            activity, v = heapq.heappop(self.heap)
+            if self.values[v] is None and -activity == self.activity[v]:
+                return v if self.phases[v] else -v
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Checks if the clauses are satisfiable with every literal in
+        assumptions true. If so, self.model maps each variable to a truth
+        value.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            self.reserve(abs(literal))
+        pure = self.pure_literals(assumptions)
+
+        # Conflicts since the last restart, and the limit before the next
+        conflicts, restart = 0, 100
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.learnt.append(learnt)
+                    self.watch(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.increment *= 1 / 0.95
+                continue
+
+            if conflicts >= restart:
+                conflicts, restart = 0, int(restart * 1.5)
+                self.backtrack(0)
+                pure = self.pure_literals(assumptions)
+                continue
+
+            # Assumptions are decided first, one level each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    self.enqueue(literal, None)
+                continue
+
+            literal = self.decide(pure)
+            if literal is None:
+                self.model = {v: self.values[v]
+                              for v in range(1, len(self.values))}
+                self.backtrack(0)
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.enqueue(literal, None)
+
+
+class Encoder():
+    """
+    Adds sentences to a Solver as clauses, numbering symbols in a
+    SymbolTable. Each compound subsentence that isn't already a clause
+    gets an auxiliary variable defined to be equivalent to it.
+    """
+
+    def __init__(self, solver=None, table=None):
+        self.solver = Solver() if solver is None else solver
+        self.table = SymbolTable() if table is None else table
+
+        # Sentence -> literal equivalent to it
+        self.literals = {}
+
+    def add(self, sentence):
+        """
+        Adds clauses requiring a sentence to be true. Returns False if
+        the solver's clauses have become unsatisfiable.
+        """
+        if isinstance(sentence, And):
+            return all(self.add(conjunct) for conjunct in sentence.conjuncts)
+        if isinstance(sentence, Or):
+            return self.clause([self.encode(disjunct)
+                                for disjunct in sentence.disjuncts])
+        if isinstance(sentence, Implication):
+            return self.clause([-self.encode(sentence.antecedent),
+                                self.encode(sentence.consequent)])
+        if isinstance(sentence, Not):
+            operand = sentence.operand
+            if isinstance(operand, Not):
+                return self.add(operand.operand)
+            if isinstance(operand, Or):
+                return all(self.add(Not(disjunct))
+                           for disjunct in operand.disjuncts)
+            if isinstance(operand, And):
+                return self.clause([-self.encode(conjunct)
+                                    for conjunct in operand.conjuncts])
+            if isinstance(operand, Implication):
+                return (self.add(operand.antecedent)
+                        and self.add(Not(operand.consequent)))
+        return self.clause([self.encode(sentence)])
+
+    def clause(self, literals):
+        self.solver.reserve(len(self.table))
+        return self.solver.add_clause(literals)
+
+    def encode(self, sentence):
+        """
+        Returns a literal equivalent to a sentence, adding the clauses
+        that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.table.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.encode(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, (And, Or)):
+            conjunction = isinstance(sentence, And)
+            operands = (sentence.conjuncts if conjunction
+                        else sentence.disjuncts)
+            literals = [self.encode(operand) for operand in operands]
+            if len(literals) == 1:
+                return literals[0]
+            x = self.table.fresh()
+
+            # x => each conjunct, and all conjuncts => x; an Or is the
+            # same with every literal negated
+            sign = 1 if conjunction else -1
+            for literal in literals:
+                self.clause([-sign * x, sign * literal])
+            self.clause([sign * x] + [-sign * literal for literal in literals])
+        elif isinstance(sentence, Implication):
+            a = self.encode(sentence.antecedent)
+            b = self.encode(sentence.consequent)
+            x = self.table.fresh()
+            self.clause([-x, -a, b])
+            self.clause([x, a])
+            self.clause([x, -b])
+        elif isinstance(sentence, Biconditional):
+            a = self.encode(sentence.left)
+            b = self.encode(sentence.right)
+            x = self.table.fresh()
+            self.clause([-x, -a, b])
+            self.clause([-x, a, -b])
+            self.clause([x, a, b])
+            self.clause([x, -a, -b])
+        else:
+            raise TypeError(f"cannot encode {type(sentence).__name__}")
+
+        self.literals[sentence] = x
+        return x
+
+    def model(self):
+        """
+        Returns the solver's model as a dictionary of symbol names to
+        truth values, like the models of logic.model_check.
+        """
+        return {name: self.solver.model.get(v, False)
+                for v, name in enumerate(self.table.names, 1)
+                if name is not None}
+
+
+class KnowledgeBase():
+    """
+    Sentences told one at a time, kept as clauses in one solver so that
+    many queries can be asked of them.
+
+    Each query is encoded once and asked as an assumption, so the clauses
+    learnt answering one query help with the next. An entailed query is
+    added to the clauses as a fact, and models found for queries that
+    aren't entailed are kept to answer later queries without solving.
+    """
+
+    def __init__(self, *sentences):
+        self.encoder = Encoder()
+        self.sentences = []
+
+        # Models of every sentence told so far, which can refute queries
+        self.models = []
+
+        # Sentence -> literal of the queries known to be entailed
+        self.entailed = {}
+
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        self.encoder.add(sentence)
+        self.sentences.append(sentence)
+
+        # Old models may not satisfy the new sentence
+        self.models = []
+
+    def ask(self, query):
+        """Checks if the knowledge base entails query."""
+        if query in self.entailed:
+            return True
+        for model in self.models:
+            if not self.evaluate(query, model):
+                return False
+
+        literal = self.encoder.encode(query)
+        solver = self.encoder.solver
+        if solver.solve([-literal]):
+            self.models.append(self.encoder.model())
+            return False
+        solver.add_clause([literal])
+        self.entailed[query] = literal
+        return True
+
+    def backbone(self, symbols=None):
+        """
+        Returns every literal (a symbol or its negation) over symbols that
+        the knowledge base entails, like logic.entailed_literals.
+
+        Each literal true in a model found so far is asked once, and
+        every new model rules out the candidates it disagrees with.
+        """
+        table = self.encoder.table
+        if symbols is None:
+            names = set().union(*[s.symbols() for s in self.sentences])
+            symbols = [Symbol(name) for name in sorted(names)]
+        if not self.satisfiable():
+            return [literal for symbol in symbols
+                    for literal in (symbol, Not(symbol))]
+
+        # Symbols the knowledge base doesn't mention are free
+        candidates = {symbol.name: self.models[0].get(symbol.name, False)
+                      for symbol in symbols if symbol.name in table.index}
+        for model in self.models[1:]:
+            candidates = {name: value for name, value in candidates.items()
+                          if model.get(name) == value}
+
+        solver = self.encoder.solver
+        for name in list(candidates):
+            if name not in candidates:
+                continue
+            v = table.index[name]
+            literal = v if candidates[name] else -v
+            if solver.solve([-literal]):
+                model = self.encoder.model()
+                self.models.append(model)
+                candidates = {other: value
+                              for other, value in candidates.items()
+                              if model[other] == value}
+            else:
+                solver.add_clause([literal])
+
+        literals = []
+        for symbol in symbols:
+            if symbol.name in candidates:
+                literals.append(symbol if candidates[symbol.name]
+                                else Not(symbol))
+        return literals
+
+    def satisfiable(self):
+        """Checks if the sentences told so far can all be true."""
+        if self.models:
+            return True
+        if self.encoder.solver.solve():
+            self.models.append(self.encoder.model())
+            return True
+        return False
+
+    def model(self):
+        """Returns a model of the knowledge base, or None if it has none."""
+        return self.models[-1] if self.satisfiable() else None
+
+    def evaluate(self, query, model):
+        """
+        Evaluates query in a model of the knowledge base. Symbols the
+        knowledge base doesn't mention are free, so they are taken to be
+        false.
+        """
+        missing = query.symbols().difference(model)
+        if missing:
+            model = dict(model)
+            model.update(dict.fromkeys(missing, False))
+        return query.evaluate(model)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model in which sentence is true, or None if it is
+    unsatisfiable.
+    """
+    encoder = Encoder()
+    if encoder.add(sentence) and encoder.solver.solve():
+        return encoder.model()
+    return None
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, like logic.model_check, by
+    checking that knowledge ∧ ¬query is unsatisfiable.
+    """
+    encoder = Encoder()
+    if not (encoder.add(knowledge) and encoder.add(Not(query))):
+        return True
+    return not encoder.solver.solve()
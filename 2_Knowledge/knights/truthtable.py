@@ -0,0 +1,148 @@
+"""
+Bit-parallel truth tables for logical sentences, using NumPy.
+
+A truth table over n symbols has 2^n rows, one per model, where model m
+assigns symbol i the value of bit i of m. Each column is packed 64 models
+to a uint64 word, so a sentence is evaluated over every model at once
+with bitwise array operations, and knowledge entails query when
+knowledge & ~query is zero everywhere.
+
+The table is evaluated in blocks of words to bound memory. Within a
+block the columns of the first six symbols are constant bit patterns and
+those of the last symbols are all ones or all zeros, so only the symbols
+in between need arrays.
+"""
+
+import numpy as np
+
+from logic import Sentence, Symbol, Not, And, Or, Implication, Biconditional
+
+# Models per word is 2^WORD_BITS, and words per block at most 2^BLOCK_BITS
+WORD_BITS = 6
+BLOCK_BITS = 12
+
+# Largest number of symbols entails will enumerate
+MAX_SYMBOLS = 30
+
+ZEROS = np.uint64(0)
+ONES = ~ZEROS
+
+# Column of symbol i < WORD_BITS within every word
+PATTERNS = [np.uint64(pattern) for pattern in (
+    0xAAAAAAAAAAAAAAAA,
+    0xCCCCCCCCCCCCCCCC,
+    0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00,
+    0xFFFF0000FFFF0000,
+    0xFFFFFFFF00000000,
+)]
+
+
+def blocks(names):
+    """
+    Yields a dictionary of symbol name -> column for each block of the
+    truth table over names, in order. Columns are uint64 scalars or
+    arrays, which broadcast together.
+    """
+    n = len(names)
+    word_bits = max(n - WORD_BITS, 0)
+    block_bits = min(word_bits, BLOCK_BITS)
+
+    # Symbols that vary from word to word within a block
+    index = np.arange(2 ** block_bits, dtype=np.uint64)
+    middle = [np.where((index >> np.uint64(bit)) & np.uint64(1), ONES, ZEROS)
+              for bit in range(block_bits)]
+
+    for start in range(0, 2 ** word_bits, 2 ** block_bits):
+        columns = {}
+        for i, name in enumerate(names):
+            if i < WORD_BITS:
+                columns[name] = PATTERNS[i]
+            elif i - WORD_BITS < block_bits:
+                columns[name] = middle[i - WORD_BITS]
+            else:
+                columns[name] = ONES if start >> (i - WORD_BITS) & 1 else ZEROS
+        yield columns
+
+
+def valid(names):
+    """Returns the mask of the bits of a word that are real models."""
+    if len(names) >= WORD_BITS:
+        return ONES
+    return np.uint64((1 << 2 ** len(names)) - 1)
+
+
+def evaluate(sentence, columns, cache=None):
+    """
+    Evaluates a sentence over a block of the truth table, given the
+    columns of its symbols. cache holds the values of subsentences
+    already evaluated in this block, keyed by id, so shared subsentences
+    (see logic.Interner) are evaluated once.
+    """
+    if isinstance(sentence, Symbol):
+        return columns[sentence.name]
+    if cache is None:
+        cache = {}
+    key = id(sentence)
+    if key in cache:
+        return cache[key]
+
+    if isinstance(sentence, Not):
+        value = ~evaluate(sentence.operand, columns, cache)
+    elif isinstance(sentence, And):
+        value = ONES
+        for conjunct in sentence.conjuncts:
+            value = value & evaluate(conjunct, columns, cache)
+    elif isinstance(sentence, Or):
+        value = ZEROS
+        for disjunct in sentence.disjuncts:
+            value = value | evaluate(disjunct, columns, cache)
+    elif isinstance(sentence, Implication):
+        value = (~evaluate(sentence.antecedent, columns, cache)
+                 | evaluate(sentence.consequent, columns, cache))
+    elif isinstance(sentence, Biconditional):
+        value = ~(evaluate(sentence.left, columns, cache)
+                  ^ evaluate(sentence.right, columns, cache))
+    else:
+        Sentence.validate(sentence)
+        raise TypeError(f"cannot evaluate {type(sentence).__name__}")
+
+    cache[key] = value
+    return value
+
+
+def truth_table(sentence, names=None):
+    """
+    Returns the truth table of a sentence over names (its own symbols,
+    sorted, by default) as an array of 2^n bits packed into uint64 words.
+    """
+    if names is None:
+        names = sorted(sentence.symbols())
+    word_bits = max(len(names) - WORD_BITS, 0)
+    table = np.empty(2 ** word_bits, dtype=np.uint64)
+    start = 0
+    for columns in blocks(names):
+        value = evaluate(sentence, columns)
+        size = min(len(table) - start, 2 ** BLOCK_BITS)
+        table[start:start + size] = value
+        start += size
+    table &= valid(names)
+    return table
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, like logic.model_check, by
+    evaluating both over every model at once.
+    """
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if len(names) > MAX_SYMBOLS:
+        raise ValueError(f"too many symbols for a truth table: {len(names)}")
+    mask = valid(names)
+    for columns in blocks(names):
+        cache = {}
+        counterexamples = (evaluate(knowledge, columns, cache)
+                           & ~evaluate(query, columns, cache) & mask)
+        if np.any(counterexamples):
+            return False
+    return True